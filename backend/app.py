@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from sevaksha_app import create_app
+from sevaksha_app.rag import start_warm_up
 from pyngrok import ngrok
 
 load_dotenv()
@@ -12,6 +13,8 @@ app, celery_app = create_app()
 if __name__ == "__main__":
     port = 5000
 
+    start_warm_up(app)
+
     public_url = ngrok.connect(port, bind_tls=True)
     print(f"✅ Public HTTPS URL: {public_url}")
 
@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Threads keep streaming chat responses from pinning a whole worker process.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = 200
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    """Drops state a worker must not share with the master.
+
+    Redis, the Gemini client, chat sessions and the embedding micro-batcher
+    reset themselves through os.register_at_fork; the database pool needs
+    the app, so it is handled here.
+    """
+    from wsgi import app
+    from sevaksha_app import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(int(os.getenv("TORCH_THREADS", 1)))
+    server.log.info(f"Worker {worker.pid} ready")
@@ -0,0 +1,57 @@
+"""backfill scheme gender and marital status
+
+Revision ID: 2e8a6f0b9d13
+Revises: 9c4d7e3f1a26
+Create Date: 2026-10-19 09:41:17.552930
+
+"""
+import json
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8a6f0b9d13'
+down_revision = '9c4d7e3f1a26'
+branch_labels = None
+depends_on = None
+
+SCHEMES_JSON = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'sevaksha_app', 'static', 'data', 'schemes.json'
+)
+SCHEME_KEY = r"lower(btrim(regexp_replace(scheme_name, '\s+', ' ', 'g')))"
+GENDERS = ('Male', 'Female', 'Neutral')
+MARITAL_STATUSES = ('Never Married', 'Currently Married', 'Widowed', 'Divorced', 'Separated')
+
+
+def upgrade():
+    # The seed used to drop these, so the gender and marital criteria never applied.
+    if not os.path.exists(SCHEMES_JSON):
+        return
+    with open(SCHEMES_JSON, 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+
+    update = sa.text(
+        f"UPDATE welfare_schemes SET gender = :gender, marital_stat = :marital_stat, "
+        f"updated_at = now() "
+        f"WHERE {SCHEME_KEY} = :scheme_key AND gender IS NULL AND marital_stat IS NULL"
+    )
+    bind = op.get_bind()
+    for scheme in schemes:
+        gender = scheme.get('gender')
+        marital_status = scheme.get('marital_status')
+        gender = gender if gender in GENDERS else None
+        marital_status = marital_status if marital_status in MARITAL_STATUSES else None
+        if gender is None and marital_status is None:
+            continue
+        bind.execute(update, {
+            'gender': gender,
+            'marital_stat': marital_status,
+            'scheme_key': ' '.join(scheme['scheme_name'].lower().split()),
+        })
+
+
+def downgrade():
+    pass
@@ -0,0 +1,115 @@
+"""baseline schema
+
+Revision ID: 5b1e0c7d2a94
+Revises: 
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e0c7d2a94'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user',
+    sa.Column('userid', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=60), nullable=False),
+    sa.Column('email', sa.String(length=60), nullable=False),
+    sa.Column('password', sa.String(length=60), nullable=False),
+    sa.Column('authenticated', sa.Boolean(), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('income', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('occupation', sa.String(length=100), nullable=True),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('marital_status', sa.String(length=20), nullable=True),
+    sa.Column('mobile', sa.String(length=10), nullable=False),
+    sa.CheckConstraint("gender IN ('Male', 'Female')", name='check_gender_valid_values'),
+    sa.CheckConstraint("marital_status IN ('Never Married', 'Currently Married', 'Widowed', 'Divorced', 'Separated')", name='check_marital_status_valid_values'),
+    sa.CheckConstraint("mobile ~ '^[0-9]{10}$'", name='check_mobile_format'),
+    sa.PrimaryKeyConstraint('userid'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('mobile')
+    )
+    op.create_table('welfare_schemes',
+    sa.Column('scheme_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('scheme_name', sa.String(length=255), nullable=False),
+    sa.Column('min_age', sa.Integer(), nullable=True),
+    sa.Column('max_age', sa.Integer(), nullable=True),
+    sa.Column('income_limit', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('target_occupation', sa.String(length=100), nullable=True),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('marital_stat', sa.String(length=20), nullable=True),
+    sa.Column('eligibility_criteria', sa.Text(), nullable=True),
+    sa.Column('required_documents', sa.Text(), nullable=True),
+    sa.Column('scheme_description', sa.Text(), nullable=True),
+    sa.Column('application_process', sa.Text(), nullable=True),
+    sa.Column('benefits', sa.Text(), nullable=True),
+    sa.Column('application_link', sa.String(length=500), nullable=True),
+    sa.Column('language_support', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("gender IN ('Male', 'Female', 'Neutral')", name='check_gender_valid_values'),
+    sa.CheckConstraint("marital_stat IN ('Never Married', 'Currently Married', 'Widowed', 'Divorced', 'Separated')", name='check_marital_stat_valid_values'),
+    sa.PrimaryKeyConstraint('scheme_id')
+    )
+    op.create_table('blacklistedtoken',
+    sa.Column('blacklistedid', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=512), nullable=False),
+    sa.Column('expiry', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('blacklistedid'),
+    sa.UniqueConstraint('token')
+    )
+    op.create_table('applications',
+    sa.Column('application_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('scheme_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("status IN ('Pending', 'Approved', 'Rejected')", name='check_application_status'),
+    sa.ForeignKeyConstraint(['scheme_id'], ['welfare_schemes.scheme_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.userid'], ),
+    sa.PrimaryKeyConstraint('application_id')
+    )
+    op.create_table('user_recommendations',
+    sa.Column('recommendation_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('scheme_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('eligible', sa.Boolean(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('matched', sa.String(length=100), nullable=False),
+    sa.Column('unmatched', sa.String(length=100), nullable=False),
+    sa.Column('unknown', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['scheme_id'], ['welfare_schemes.scheme_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.userid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recommendation_id')
+    )
+    op.create_index('ix_user_recommendations_scheme', 'user_recommendations', ['scheme_id'], unique=False)
+    op.create_index('ix_user_recommendations_user_rank', 'user_recommendations', ['user_id', 'rank'], unique=False)
+    op.create_table('recommendation_state',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('profile_hash', sa.String(length=64), nullable=False),
+    sa.Column('catalog_version', sa.String(length=100), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.userid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('recommendation_state')
+    op.drop_index('ix_user_recommendations_user_rank', table_name='user_recommendations')
+    op.drop_index('ix_user_recommendations_scheme', table_name='user_recommendations')
+    op.drop_table('user_recommendations')
+    op.drop_table('applications')
+    op.drop_table('blacklistedtoken')
+    op.drop_table('welfare_schemes')
+    op.drop_table('user')
@@ -0,0 +1,48 @@
+"""hot query indexes
+
+Revision ID: 9c4d7e3f1a26
+Revises: 5b1e0c7d2a94
+Create Date: 2026-10-18 10:27:05.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d7e3f1a26'
+down_revision = '5b1e0c7d2a94'
+branch_labels = None
+depends_on = None
+
+# Same normalization as rag.data_loader.scheme_key: lowercased, whitespace collapsed.
+SCHEME_KEY = r"lower(btrim(regexp_replace(scheme_name, '\s+', ' ', 'g')))"
+
+
+def upgrade():
+    # Databases first built with db.create_all() may already have some of these.
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT {SCHEME_KEY} AS scheme_key, count(*) FROM welfare_schemes "
+        f"GROUP BY 1 HAVING count(*) > 1"
+    )).fetchall()
+    if duplicates:
+        names = ", ".join(repr(row.scheme_key) for row in duplicates)
+        raise RuntimeError(
+            f"Merge or rename duplicate welfare schemes before upgrading: {names}"
+        )
+
+    op.create_index('ix_applications_user_status', 'applications', ['user_id', 'status'], unique=False, if_not_exists=True)
+    op.create_index('ix_applications_scheme', 'applications', ['scheme_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_applications_pending', 'applications', ['created_at'], unique=False, postgresql_where=sa.text("status = 'Pending'"), if_not_exists=True)
+    op.create_index('uq_welfare_schemes_scheme_key', 'welfare_schemes', [sa.text(SCHEME_KEY)], unique=True, if_not_exists=True)
+    op.create_index('ix_welfare_schemes_updated_at', 'welfare_schemes', ['updated_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_blacklistedtoken_expiry', 'blacklistedtoken', ['expiry'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_blacklistedtoken_expiry', table_name='blacklistedtoken')
+    op.drop_index('ix_welfare_schemes_updated_at', table_name='welfare_schemes')
+    op.drop_index('uq_welfare_schemes_scheme_key', table_name='welfare_schemes')
+    op.drop_index('ix_applications_pending', table_name='applications', postgresql_where=sa.text("status = 'Pending'"))
+    op.drop_index('ix_applications_scheme', table_name='applications')
+    op.drop_index('ix_applications_user_status', table_name='applications')
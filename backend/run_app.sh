@@ -2,4 +2,6 @@
 
 redis-server
 
+python3 -m sevaksha_app.rag.build_vector_store
+
 python3 app.py
\ No newline at end of file
@@ -0,0 +1,5 @@
+#!/bin/bash
+
+python3 -m sevaksha_app.rag.build_vector_store
+
+gunicorn -c gunicorn.conf.py wsgi:app
@@ -3,19 +3,20 @@ from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-import os
 from flask_mail import Mail
+from flask_migrate import Migrate
 from flask_caching import Cache
+from werkzeug.middleware.proxy_fix import ProxyFix
 from sevaksha_app.config import Config
 from sevaksha_app.worker import celery_init_app
 from celery.schedules import crontab
 import flask_excel as excel
-import json
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 mail = Mail()
 cache = Cache()
+migrate = Migrate()
 celery_app = None
 ist = timezone(timedelta(hours=5, minutes=30))
 
@@ -24,49 +25,31 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     CORS(app)
     app.config.from_object(Config)
+    proxies = app.config["TRUSTED_PROXIES"]
+    if proxies:
+        # request.remote_addr is then the client's address, not the proxy's.
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies
+        )
+
+    from sevaksha_app.schema import MIGRATIONS_DIR, prepare_database
 
     db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
     bcrypt.init_app(app)
     mail.init_app(app)
     cache.init_app(app)
     excel.init_excel(app)
     celery_app = celery_init_app(app)
 
-    from sevaksha_app.models import User, WelfareScheme
     with app.app_context():
-        db.create_all()
-
-        json_path = os.path.join(app.root_path, "static", "data", "schemes.json")
-        if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as f:
-                schemes = json.load(f)
-            for scheme_data in schemes:
-                existing = WelfareScheme.query.filter_by(
-                    scheme_name=scheme_data["scheme_name"]
-                ).first()
-                if not existing:
-                    scheme = WelfareScheme(
-                        scheme_name=scheme_data.get("scheme_name"),
-                        min_age=scheme_data.get("min_age"),
-                        max_age=scheme_data.get("max_age"),
-                        income_limit=scheme_data.get("income_limit"),
-                        target_occupation=scheme_data.get("target_occupation"),
-                        eligibility_criteria=scheme_data.get("eligibility_criteria"),
-                        required_documents=scheme_data.get("required_documents"),
-                        scheme_description=scheme_data.get("scheme_description"),
-                        application_process=scheme_data.get("application_process"),
-                        benefits=scheme_data.get("benefits"),
-                        application_link=scheme_data.get("application_link"),
-                        language_support=scheme_data.get("language_support"),
-                        is_active=scheme_data.get("is_active", True),
-                    )
-                    db.session.add(scheme)
-            db.session.commit()
+        prepare_database(app)
 
     from sevaksha_app.tasks import (
         daily_remainder,
         monthly_report,
         delete_blacklisted_tokens,
+        refresh_recommendations,
     )
 
     celery_app.conf.beat_schedule = {
@@ -78,6 +61,10 @@ def create_app(config_class=Config):
             "task": "sevaksha_app.tasks.delete_blacklisted_tokens",
             "schedule": crontab(minute="*/10"),
         },
+        "refresh-recommendations": {
+            "task": "sevaksha_app.tasks.refresh_recommendations",
+            "schedule": crontab(minute=0),
+        },
         "daily-remainder": {
             "task": "sevaksha_app.tasks.daily_remainder",
             "schedule": crontab(minute="*/10"),
@@ -86,8 +73,12 @@ def create_app(config_class=Config):
 
     from sevaksha_app.main import main
     from sevaksha_app.user import user
+    from sevaksha_app.health import health
+    from sevaksha_app.internal import internal
 
     app.register_blueprint(main, url_prefix="/api/main")
     app.register_blueprint(user, url_prefix="/api/user")
+    app.register_blueprint(health, url_prefix="/health")
+    app.register_blueprint(internal, url_prefix="/internal")
 
     return app, celery_app
@@ -8,10 +8,45 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get("SQLALCHEMY_TRACK_MODIFICATIONS")
+    SCHEMA_AUTO_UPGRADE = os.environ.get("SCHEMA_AUTO_UPGRADE", "true").lower() == "true"
     CACHE_TYPE = os.environ.get("CACHE_TYPE")
     CACHE_DEFAULT_TIMEOUT = os.environ.get("CACHE_DEFAULT_TIMEOUT")
     CACHE_REDIS_HOST = os.environ.get("CACHE_REDIS_HOST")
     CACHE_REDIS_PORT = os.environ.get("CACHE_REDIS_PORT")
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    # Every gunicorn worker has its own hashing pool; together they should fill the cores once.
+    PASSWORD_HASH_WORKERS = int(
+        os.environ.get(
+            "PASSWORD_HASH_WORKERS",
+            max(1, (os.cpu_count() or 1) // int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))),
+        )
+    )
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", 2.0))
+    # Reverse proxies in front of the app whose X-Forwarded-* headers are trusted.
+    # Leave at 0 when clients connect directly, or they can spoof their address.
+    TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", 0))
+    # Bearer token for /internal/stats; the endpoint answers 404 while it is unset.
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_LOGIN = os.environ.get("RATE_LIMIT_LOGIN", "ip:20/60,identifier:5/300")
+    RATE_LIMIT_RESET = os.environ.get("RATE_LIMIT_RESET", "ip:5/300,identifier:3/3600")
+    RATE_LIMIT_SEARCH = os.environ.get("RATE_LIMIT_SEARCH", "ip:30/60")
+    RATE_LIMIT_CHAT = os.environ.get("RATE_LIMIT_CHAT", "user:20/60,ip:60/60")
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 30))
+    SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", 1024))
+    SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", 86400))
+    SEARCH_CACHE_SIMILARITY = float(os.environ.get("SEARCH_CACHE_SIMILARITY", 0.92))
+    HYBRID_SEARCH_ALPHA = float(os.environ.get("HYBRID_SEARCH_ALPHA", 0.5))
+    ELIGIBILITY_BATCH_MAX = int(os.environ.get("ELIGIBILITY_BATCH_MAX", 100000))
+    ELIGIBILITY_BATCH_SYNC_LIMIT = int(os.environ.get("ELIGIBILITY_BATCH_SYNC_LIMIT", 5000))
+    ELIGIBILITY_BATCH_CHUNK_SIZE = int(os.environ.get("ELIGIBILITY_BATCH_CHUNK_SIZE", 1000))
+    ELIGIBILITY_BATCH_TTL = int(os.environ.get("ELIGIBILITY_BATCH_TTL", 86400))
+    REVOCATION_BLOOM_CAPACITY = int(os.environ.get("REVOCATION_BLOOM_CAPACITY", 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    REVOCATION_BLOOM_REBUILD_SECONDS = int(os.environ.get("REVOCATION_BLOOM_REBUILD_SECONDS", 3600))
+    TOKEN_CLEANUP_BATCH_SIZE = int(os.environ.get("TOKEN_CLEANUP_BATCH_SIZE", 1000))
+    TOKEN_CLEANUP_TIME_BUDGET = float(os.environ.get("TOKEN_CLEANUP_TIME_BUDGET", 30))
     CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND")
     CELERY_TIMEZONE = os.environ.get("CELERY_TIMEZONE")
@@ -0,0 +1,398 @@
+import csv
+import io
+import json
+import re
+import threading
+import time
+import uuid
+import numpy as np
+from flask import current_app
+from sqlalchemy import func
+from sevaksha_app import db
+
+CRITERIA = ("age", "income", "occupation", "gender", "marital_status")
+# Target occupations are free-text descriptions of the intended audience,
+# so a mismatch lowers the rank instead of ruling the scheme out.
+HARD_CRITERIA = np.array([True, True, False, True, True])
+CATALOG_CHECK_SECONDS = 60
+BATCH_KEY_PREFIX = "sevaksha:eligibility-batch:"
+
+_OPEN_VALUES = {"", "neutral", "none", "any", "all"}
+_STOPWORDS = {
+    "and", "any", "all", "are", "etc", "for", "from", "like", "not",
+    "other", "others", "the", "with", "who", "whose",
+}
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _tokens(text):
+    if not text:
+        return set()
+    tokens = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < 3 or token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        tokens.add(token)
+    return tokens
+
+
+def _category(value):
+    if value is None or str(value).strip().lower() in _OPEN_VALUES:
+        return ""
+    return str(value).strip().lower()
+
+
+def _number(value):
+    return np.nan if value is None or value == "" else float(value)
+
+
+def catalog_version():
+    """Cheap fingerprint of the scheme catalog, changes whenever a scheme is added, removed or edited."""
+    from sevaksha_app.models import WelfareScheme
+
+    count, last_id, last_update = db.session.query(
+        func.count(WelfareScheme.scheme_id),
+        func.max(WelfareScheme.scheme_id),
+        func.max(WelfareScheme.updated_at),
+    ).one()
+    return f"{count}:{last_id}:{last_update.isoformat() if last_update else ''}"
+
+
+def _names(flags):
+    return [criterion for criterion, flag in zip(CRITERIA, flags) if flag]
+
+
+def clean_profile(row, position):
+    """Validates one batch row; returns (profile, error)."""
+    profile = {"id": row.get("id") if row.get("id") not in (None, "") else position}
+    for field in CRITERIA:
+        value = row.get(field)
+        profile[field] = None if value in (None, "") else value
+    try:
+        if profile["age"] is not None:
+            profile["age"] = int(float(profile["age"]))
+        if profile["income"] is not None:
+            profile["income"] = float(profile["income"])
+    except (TypeError, ValueError):
+        return profile, "age and income must be numbers"
+    return profile, None
+
+
+def parse_profiles_csv(text):
+    """Rows of a CSV upload with a header naming any of the profile fields."""
+    reader = csv.DictReader(io.StringIO(text))
+    return [
+        {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+        for row in reader
+    ]
+
+
+def profile_from_user(user):
+    return {
+        "age": user.age,
+        "income": user.income,
+        "occupation": user.occupation,
+        "gender": user.gender,
+        "marital_status": user.marital_status,
+    }
+
+
+class EligibilityEngine:
+    """Active scheme catalog held as NumPy columns, evaluated against many profiles at once.
+
+    Each criterion is reported per profile and scheme as matched, unmatched
+    or unknown (the profile does not say). Criteria a scheme does not
+    restrict are ignored. A scheme is eligible when no hard criterion is
+    unmatched.
+    """
+
+    def __init__(self, schemes, version=None):
+        self.version = version
+        self.scheme_ids = np.array([s.scheme_id for s in schemes], dtype=np.int64)
+        self.scheme_names = [s.scheme_name for s in schemes]
+        self.min_age = np.array([_number(s.min_age) for s in schemes], dtype=np.float64)
+        self.max_age = np.array([_number(s.max_age) for s in schemes], dtype=np.float64)
+        self.income_limit = np.array(
+            [_number(s.income_limit) for s in schemes], dtype=np.float64
+        )
+
+        self._categories = {"": 0}
+        self.gender = np.array(
+            [self._code(_category(s.gender)) for s in schemes], dtype=np.int32
+        )
+        self.marital_status = np.array(
+            [self._code(_category(s.marital_stat)) for s in schemes], dtype=np.int32
+        )
+
+        occupation_tokens = [
+            _tokens(s.target_occupation) if _category(s.target_occupation) else set()
+            for s in schemes
+        ]
+        self.vocabulary = {
+            token: position
+            for position, token in enumerate(sorted(set().union(*occupation_tokens)))
+        }
+        self.occupation = np.zeros(
+            (len(schemes), len(self.vocabulary)), dtype=np.float32
+        )
+        for row, tokens in enumerate(occupation_tokens):
+            for token in tokens:
+                self.occupation[row, self.vocabulary[token]] = 1.0
+
+        self.applicable = np.stack(
+            [
+                ~(np.isnan(self.min_age) & np.isnan(self.max_age)),
+                ~np.isnan(self.income_limit),
+                self.occupation.any(axis=1),
+                self.gender != 0,
+                self.marital_status != 0,
+            ],
+            axis=1,
+        )
+
+    @classmethod
+    def from_catalog(cls, version=None):
+        from sevaksha_app.models import WelfareScheme
+
+        version = version or catalog_version()
+        schemes = (
+            WelfareScheme.query.filter(WelfareScheme.is_active.is_(True))
+            .order_by(WelfareScheme.scheme_id)
+            .all()
+        )
+        return cls(schemes, version=version)
+
+    def __len__(self):
+        return len(self.scheme_ids)
+
+    def _code(self, value):
+        return self._categories.setdefault(value, len(self._categories))
+
+    def _profile_columns(self, profiles):
+        age = np.array([_number(p.get("age")) for p in profiles], dtype=np.float64)
+        income = np.array(
+            [_number(p.get("income")) for p in profiles], dtype=np.float64
+        )
+        gender = np.array(
+            [self._categories.get(_category(p.get("gender")), -1) for p in profiles],
+            dtype=np.int32,
+        )
+        gender_known = np.array([bool(_category(p.get("gender"))) for p in profiles])
+        marital_status = np.array(
+            [
+                self._categories.get(_category(p.get("marital_status")), -1)
+                for p in profiles
+            ],
+            dtype=np.int32,
+        )
+        marital_known = np.array(
+            [bool(_category(p.get("marital_status"))) for p in profiles]
+        )
+        occupation = np.zeros((len(profiles), len(self.vocabulary)), dtype=np.float32)
+        occupation_known = np.zeros(len(profiles), dtype=bool)
+        for row, profile in enumerate(profiles):
+            tokens = _tokens(profile.get("occupation"))
+            occupation_known[row] = bool(tokens)
+            for token in tokens:
+                position = self.vocabulary.get(token)
+                if position is not None:
+                    occupation[row, position] = 1.0
+        return (
+            age,
+            income,
+            occupation,
+            occupation_known,
+            gender,
+            gender_known,
+            marital_status,
+            marital_known,
+        )
+
+    def evaluate(self, profiles):
+        """Returns (matched, unmatched, unknown) boolean arrays shaped (profiles, schemes, criteria)."""
+        (
+            age,
+            income,
+            occupation,
+            occupation_known,
+            gender,
+            gender_known,
+            marital_status,
+            marital_known,
+        ) = self._profile_columns(profiles)
+
+        with np.errstate(invalid="ignore"):
+            age_ok = (np.isnan(self.min_age) | (age[:, None] >= self.min_age)) & (
+                np.isnan(self.max_age) | (age[:, None] <= self.max_age)
+            )
+            income_ok = np.isnan(self.income_limit) | (
+                income[:, None] <= self.income_limit
+            )
+        occupation_ok = (occupation @ self.occupation.T) > 0
+        gender_ok = gender[:, None] == self.gender
+        marital_ok = marital_status[:, None] == self.marital_status
+
+        ok = np.stack([age_ok, income_ok, occupation_ok, gender_ok, marital_ok], axis=2)
+        known = np.stack(
+            [~np.isnan(age), ~np.isnan(income), occupation_known, gender_known, marital_known],
+            axis=1,
+        )[:, None, :]
+        applicable = self.applicable[None, :, :]
+
+        matched = applicable & known & ok
+        unmatched = applicable & known & ~ok
+        unknown = applicable & ~known
+        return matched, unmatched, unknown
+
+    def screen(self, profiles):
+        """Eligible scheme ids per profile, best match first, without the per-criterion detail."""
+        if not len(self) or not profiles:
+            return [[] for _ in profiles]
+        matched, unmatched, unknown = self.evaluate(profiles)
+        hard_unmatched = (unmatched & HARD_CRITERIA).sum(axis=2)
+        score = (
+            matched.sum(axis=2)
+            - 0.5 * unknown.sum(axis=2)
+            - (unmatched & ~HARD_CRITERIA).sum(axis=2)
+        )
+        order = np.argsort(-score, axis=1, kind="stable")
+        eligible = np.take_along_axis(hard_unmatched == 0, order, axis=1)
+        return [
+            self.scheme_ids[row_order[row_eligible]].tolist()
+            for row_order, row_eligible in zip(order, eligible)
+        ]
+
+    def recommend(self, profiles, limit=None, include_ineligible=False):
+        """Ranks schemes for every profile: eligible ones first, most specific matches first."""
+        if not len(self) or not profiles:
+            return [[] for _ in profiles]
+
+        matched, unmatched, unknown = self.evaluate(profiles)
+        hard_unmatched = (unmatched & HARD_CRITERIA).sum(axis=2)
+        soft_unmatched = (unmatched & ~HARD_CRITERIA).sum(axis=2)
+        eligible = hard_unmatched == 0
+        score = matched.sum(axis=2) - 0.5 * unknown.sum(axis=2) - soft_unmatched
+        order = np.argsort(10 * hard_unmatched - score, axis=1, kind="stable")
+        counts = np.full(len(profiles), len(self)) if include_ineligible else eligible.sum(axis=1)
+
+        results = []
+        for row in range(len(profiles)):
+            take = counts[row] if limit is None else min(counts[row], limit)
+            ranked = []
+            for column in order[row, :take]:
+                ranked.append(
+                    {
+                        "scheme_id": int(self.scheme_ids[column]),
+                        "eligible": bool(eligible[row, column]),
+                        "score": float(score[row, column]),
+                        "matched": _names(matched[row, column]),
+                        "unmatched": _names(unmatched[row, column]),
+                        "unknown": _names(unknown[row, column]),
+                    }
+                )
+            results.append(ranked)
+        return results
+
+
+def screen_rows(engine, rows, chunk_size=1000, first_position=0):
+    """Yields one result per batch row in input order: its eligible scheme ids or a validation error.
+
+    Rows without an id are identified by their position in the whole
+    batch, which starts at ``first_position`` for this slice of it.
+    """
+    for start in range(0, len(rows), chunk_size):
+        cleaned = [
+            clean_profile(row, first_position + start + offset)
+            for offset, row in enumerate(rows[start : start + chunk_size])
+        ]
+        scheme_ids = iter(engine.screen([p for p, error in cleaned if error is None]))
+        for profile, error in cleaned:
+            if error:
+                yield {"id": profile["id"], "error": error}
+            else:
+                yield {"id": profile["id"], "scheme_ids": next(scheme_ids)}
+
+
+class BatchStore:
+    """Uploads and results of queued batches, kept as Redis lists of JSON rows.
+
+    Only the batch id travels through the Celery broker and result
+    backend. Every key expires ``ttl`` seconds after the batch was created.
+    """
+
+    def __init__(self, redis_client, ttl):
+        self.redis = redis_client
+        self.ttl = ttl
+
+    def _key(self, batch_id, part):
+        return f"{BATCH_KEY_PREFIX}{batch_id}:{part}"
+
+    def create(self, userid, rows, chunk_size):
+        """Stores ``rows`` for ``userid``; returns the new batch id."""
+        batch_id = uuid.uuid4().hex
+        rows_key = self._key(batch_id, "rows")
+        for start in range(0, len(rows), chunk_size):
+            self.redis.rpush(rows_key, *(json.dumps(row) for row in rows[start : start + chunk_size]))
+        pipe = self.redis.pipeline()
+        pipe.expire(rows_key, self.ttl)
+        pipe.set(self._key(batch_id, "owner"), userid, ex=self.ttl)
+        pipe.execute()
+        return batch_id
+
+    def owner(self, batch_id):
+        owner = self.redis.get(self._key(batch_id, "owner"))
+        return int(owner) if owner is not None else None
+
+    def row_chunks(self, batch_id, chunk_size):
+        """The uploaded rows, ``chunk_size`` at a time."""
+        rows_key = self._key(batch_id, "rows")
+        for start in range(0, self.redis.llen(rows_key), chunk_size):
+            yield [
+                json.loads(row)
+                for row in self.redis.lrange(rows_key, start, start + chunk_size - 1)
+            ]
+
+    def add_results(self, batch_id, results):
+        results_key = self._key(batch_id, "results")
+        pipe = self.redis.pipeline()
+        pipe.rpush(results_key, *(json.dumps(result) for result in results))
+        pipe.expire(results_key, self.ttl)
+        pipe.execute()
+
+    def results(self, batch_id, offset, limit):
+        results_key = self._key(batch_id, "results")
+        return [
+            json.loads(result)
+            for result in self.redis.lrange(results_key, offset, offset + limit - 1)
+        ]
+
+    def drop_rows(self, batch_id):
+        self.redis.delete(self._key(batch_id, "rows"))
+
+
+def get_batch_store():
+    from sevaksha_app.redis_client import get_redis
+
+    return BatchStore(get_redis(), current_app.config["ELIGIBILITY_BATCH_TTL"])
+
+
+_engine = None
+_engine_checked_at = 0.0
+_engine_lock = threading.Lock()
+
+
+def get_eligibility_engine():
+    """Process-wide engine, rebuilt when the catalog fingerprint changes."""
+    global _engine, _engine_checked_at
+    now = time.monotonic()
+    if _engine is not None and now - _engine_checked_at < CATALOG_CHECK_SECONDS:
+        return _engine
+    with _engine_lock:
+        if _engine is None or now - _engine_checked_at >= CATALOG_CHECK_SECONDS:
+            version = catalog_version()
+            if _engine is None or _engine.version != version:
+                _engine = EligibilityEngine.from_catalog(version)
+            _engine_checked_at = now
+    return _engine
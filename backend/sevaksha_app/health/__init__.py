@@ -0,0 +1,6 @@
+from sevaksha_app.utils import DecoratedBlueprint
+from sevaksha_app.utils import handle_exceptions
+
+health = DecoratedBlueprint("health", __name__, decorators=[handle_exceptions])
+
+from .routes import *
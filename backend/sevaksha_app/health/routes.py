@@ -0,0 +1,37 @@
+from flask import current_app, jsonify
+from sqlalchemy import text
+from sevaksha_app import db
+from sevaksha_app.rag import is_ready, start_warm_up, warm_up_status
+from . import health
+
+
+@health.route("/live", methods=["GET"])
+def live():
+    return jsonify({"status": "alive"}), 200
+
+
+@health.route("/ready", methods=["GET"])
+def ready():
+    try:
+        db.session.execute(text("SELECT 1"))
+        database = True
+    except Exception as e:
+        print(f"Readiness check: database unavailable: {e}")
+        db.session.rollback()
+        database = False
+
+    rag = warm_up_status()
+    # Ignored while warming up, after a stale index and during the retry back-off.
+    start_warm_up(current_app._get_current_object())
+
+    status = 200 if database and is_ready() else 503
+    return (
+        jsonify(
+            {
+                "status": "ready" if status == 200 else "starting",
+                "database": database,
+                "rag": rag,
+            }
+        ),
+        status,
+    )
@@ -0,0 +1,8 @@
+from sevaksha_app.utils import DecoratedBlueprint
+from sevaksha_app.utils import handle_exceptions, metrics_token_required
+
+internal = DecoratedBlueprint(
+    "internal", __name__, decorators=[metrics_token_required, handle_exceptions]
+)
+
+from .routes import *
@@ -0,0 +1,19 @@
+from flask import jsonify
+from sevaksha_app.main.routes import get_search_cache, search_routes
+from sevaksha_app.rag import get_engine
+from sevaksha_app.rag.gemini_api import client as llm_client
+from sevaksha_app.rate_limit import get_rate_limiter
+from sevaksha_app.utils import rag_required
+from . import internal
+
+
+@internal.route("/stats", methods=["GET"])
+@rag_required
+def stats():
+    stats = get_search_cache().stats()
+    stats["routes"] = dict(search_routes)
+    stats["query_embeddings"] = get_engine().embeddings.stats()
+    stats["context"] = get_engine().context_stats()
+    stats["llm"] = dict(llm_client.stats(), provider=llm_client.name)
+    stats["rate_limits"] = get_rate_limiter().stats()
+    return jsonify(stats), 200
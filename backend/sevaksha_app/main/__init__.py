@@ -1,6 +1,20 @@
 from sevaksha_app.utils import DecoratedBlueprint
 from sevaksha_app.utils import handle_exceptions
+from sevaksha_app.rate_limit import rate_limit
 
-main = DecoratedBlueprint("main", __name__, decorators=[handle_exceptions])
+main = DecoratedBlueprint(
+    "main",
+    __name__,
+    decorators=[
+        rate_limit(
+            {
+                "login": "RATE_LIMIT_LOGIN",
+                "reset_request": "RATE_LIMIT_RESET",
+                "search": "RATE_LIMIT_SEARCH",
+            }
+        ),
+        handle_exceptions,
+    ],
+)
 
 from .routes import *
@@ -1,6 +1,8 @@
 from flask import jsonify, request, current_app
-from sevaksha_app import db, bcrypt
+from sevaksha_app import db
 from sevaksha_app.models import User, WelfareScheme
+from sevaksha_app.passwords import PasswordHasherBusy, get_password_hasher
+from sevaksha_app.recommendations import queue_refresh
 from sevaksha_app.utils import (
     send_reset_email,
     form_errors,
@@ -15,10 +17,28 @@ from sevaksha_app.main.forms import (
 from . import main
 from datetime import datetime, timezone, timedelta
 import jwt
-from sevaksha_app.rag.qa_chain import create_qa_chain
+from sevaksha_app.rag import get_engine, is_ready, start_warm_up
+from sevaksha_app.rag.cache import SemanticCache
+from sevaksha_app.rag.hybrid import get_hybrid_searcher, is_keyword_query
+from sevaksha_app.redis_client import get_redis
 
 
-qa_chain = create_qa_chain()
+search_cache = None
+search_routes = {"index": 0, "llm": 0}
+
+
+def get_search_cache():
+    global search_cache
+    if search_cache is None:
+        search_cache = SemanticCache(
+            get_engine().embeddings.embed_query,
+            max_entries=current_app.config["SEARCH_CACHE_SIZE"],
+            similarity_threshold=current_app.config["SEARCH_CACHE_SIMILARITY"],
+            ttl=current_app.config["SEARCH_CACHE_TTL"],
+            redis_client=get_redis(),
+            namespace="sevaksha:search",
+        )
+    return search_cache
 
 
 @main.route("/search", methods=["POST"])
@@ -30,20 +50,50 @@ def search():
     if not form.validate():
         return jsonify({"error": form_errors(form.errors)}), 400
 
-    response_text = qa_chain.run(form.search_term.data).strip()
+    query = form.search_term.data
+    engine = get_engine() if is_ready() else None
+    scheme_ids = None
+    if is_keyword_query(query):
+        searcher = get_hybrid_searcher(
+            engine.vector_store if engine else None,
+            current_app.config["HYBRID_SEARCH_ALPHA"],
+        )
+        scheme_ids = searcher.search(query) or None
+        if scheme_ids:
+            search_routes["index"] += 1
 
-    if "couldn't find any scheme" in response_text.lower():
-        return jsonify({"results": None}), 200
+    if scheme_ids is None:
+        if engine is None:
+            start_warm_up(current_app._get_current_object())
+            return (
+                jsonify({"error": "Search is starting up. Please try again shortly."}),
+                503,
+                {"Retry-After": "5"},
+            )
+        search_routes["llm"] += 1
+        cache = get_search_cache()
+        scheme_ids = cache.get(query, engine.version)
+        if scheme_ids is None:
+            response_text = engine.answer(query, "search").strip()
+            if response_text.startswith("❌"):
+                return jsonify({"results": None}), 200
+            scheme_ids = engine.scheme_ids_for_names(
+                line.lstrip("- ").strip()
+                for line in response_text.splitlines()
+                if line.startswith("- ")
+            )
+            cache.set(query, engine.version, scheme_ids)
 
-    scheme_names = [
-        line.lstrip("- ").strip()
-        for line in response_text.splitlines()
-        if line.startswith("- ")
-    ]
+    if not scheme_ids:
+        return jsonify({"results": None}), 200
 
-    schemes = WelfareScheme.query.filter(
-        WelfareScheme.scheme_name.in_(scheme_names)
-    ).all()
+    by_id = {
+        scheme.scheme_id: scheme
+        for scheme in WelfareScheme.query.filter(
+            WelfareScheme.scheme_id.in_(scheme_ids)
+        ).all()
+    }
+    schemes = [by_id[scheme_id] for scheme_id in scheme_ids if scheme_id in by_id]
 
     result = []
     for scheme in schemes:
@@ -100,6 +150,7 @@ def register():
             print(user)
             db.session.add(user)
             db.session.commit()
+            queue_refresh([user.userid])
             return jsonify({"message": f"Account created for {user.name}!"}), 201
 
         except (ValueError, TypeError) as e:
@@ -126,7 +177,15 @@ def login():
             (User.email == form.identifier.data) | (User.mobile == form.identifier.data)
         ).first()
 
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        hasher = get_password_hasher()
+        if user and hasher.check(user.password, form.password.data):
+            if hasher.needs_rehash(user.password):
+                # Move the stored hash to the configured cost while we have the password.
+                try:
+                    user.password = hasher.hash(form.password.data)
+                    db.session.commit()
+                except PasswordHasherBusy:
+                    pass
             try:
                 token = jwt.encode(
                     {
@@ -216,9 +275,7 @@ def reset_password(token):
         )
     form = ResetPasswordForm(data=data)
     if form.validate():
-        user.password = bcrypt.generate_password_hash(form.password.data).decode(
-            "utf-8"
-        )
+        user.password = get_password_hasher().hash(form.password.data)
         db.session.commit()
         return jsonify({"message": "Your password has been updated!"}), 201
     else:
@@ -1,8 +1,11 @@
 import jwt
 from datetime import datetime, timedelta, timezone
 from flask import current_app
-from sevaksha_app import db, bcrypt, ist
-from sqlalchemy import CheckConstraint
+from sevaksha_app import db, ist
+from sqlalchemy import CheckConstraint, text
+
+# Same normalization as rag.data_loader.scheme_key: lowercased, whitespace collapsed.
+SCHEME_KEY_SQL = r"lower(btrim(regexp_replace(scheme_name, '\s+', ' ', 'g')))"
 
 
 class User(db.Model):
@@ -49,7 +52,9 @@ class User(db.Model):
     ):
         self.name = name
         self.email = email
-        self.password = bcrypt.generate_password_hash(password).decode("utf-8")
+        from sevaksha_app.passwords import get_password_hasher
+
+        self.password = get_password_hasher().hash(password)
         self.authenticated = authenticated
         self.age = age
         self.income = income
@@ -166,6 +171,8 @@ class WelfareScheme(db.Model):
             "marital_stat IN ('Never Married', 'Currently Married', 'Widowed', 'Divorced', 'Separated')",
             name="check_marital_stat_valid_values",
         ),
+        db.Index("uq_welfare_schemes_scheme_key", text(SCHEME_KEY_SQL), unique=True),
+        db.Index("ix_welfare_schemes_updated_at", "updated_at"),
     )
 
     def __init__(
@@ -215,7 +222,7 @@ class BlacklistedToken(db.Model):
     __tablename__ = "blacklistedtoken"
     blacklistedid = db.Column(db.Integer, primary_key=True)
     token = db.Column(db.String(512), unique=True, nullable=False)
-    expiry = db.Column(db.DateTime, nullable=False)
+    expiry = db.Column(db.DateTime, nullable=False, index=True)
 
     def __init__(self, token, expiry):
         self.token = token
@@ -258,6 +265,13 @@ class Application(db.Model):
             "status IN ('Pending', 'Approved', 'Rejected')",
             name="check_application_status",
         ),
+        db.Index("ix_applications_user_status", "user_id", "status"),
+        db.Index("ix_applications_scheme", "scheme_id"),
+        db.Index(
+            "ix_applications_pending",
+            "created_at",
+            postgresql_where=text("status = 'Pending'"),
+        ),
     )
 
     def __init__(self, user_id, scheme_id, status="Pending"):
@@ -277,3 +291,73 @@ class Application(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class UserRecommendation(db.Model):
+    __tablename__ = "user_recommendations"
+
+    recommendation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("user.userid", ondelete="CASCADE"), nullable=False
+    )
+    scheme_id = db.Column(
+        db.Integer,
+        db.ForeignKey("welfare_schemes.scheme_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    rank = db.Column(db.Integer, nullable=False)
+    eligible = db.Column(db.Boolean, nullable=False, default=True)
+    score = db.Column(db.Float, nullable=False, default=0.0)
+    matched = db.Column(db.String(100), nullable=False, default="")
+    unmatched = db.Column(db.String(100), nullable=False, default="")
+    unknown = db.Column(db.String(100), nullable=False, default="")
+
+    __table_args__ = (
+        db.Index("ix_user_recommendations_user_rank", "user_id", "rank"),
+        db.Index("ix_user_recommendations_scheme", "scheme_id"),
+    )
+
+    def __init__(self, user_id, scheme_id, rank, eligible=True, score=0.0, matched="", unmatched="", unknown=""):
+        self.user_id = user_id
+        self.scheme_id = scheme_id
+        self.rank = rank
+        self.eligible = eligible
+        self.score = score
+        self.matched = matched
+        self.unmatched = unmatched
+        self.unknown = unknown
+
+    def __repr__(self):
+        return f"UserRecommendation(user_id='{self.user_id}', scheme_id='{self.scheme_id}', rank={self.rank})"
+
+    def to_dict(self):
+        return {
+            "scheme_id": self.scheme_id,
+            "eligible": self.eligible,
+            "score": self.score,
+            "matched": [c for c in self.matched.split(",") if c],
+            "unmatched": [c for c in self.unmatched.split(",") if c],
+            "unknown": [c for c in self.unknown.split(",") if c],
+        }
+
+
+class RecommendationState(db.Model):
+    __tablename__ = "recommendation_state"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("user.userid", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    profile_hash = db.Column(db.String(64), nullable=False)
+    catalog_version = db.Column(db.String(100), nullable=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+    def __init__(self, user_id, profile_hash, catalog_version, refreshed_at):
+        self.user_id = user_id
+        self.profile_hash = profile_hash
+        self.catalog_version = catalog_version
+        self.refreshed_at = refreshed_at
+
+    def __repr__(self):
+        return f"RecommendationState('{self.user_id}', '{self.catalog_version}', '{self.refreshed_at}')"
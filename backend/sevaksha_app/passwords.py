@@ -0,0 +1,163 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from flask import current_app, has_request_context
+
+DEFAULT_ROUNDS = 12
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool's queue is full; callers should answer 503."""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds, prefix=b"2b")).decode(
+        "utf-8"
+    )
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_rounds(hashed):
+    """The bcrypt cost a stored hash was made with, e.g. 12 for "$2b$12$..."."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt on a small bounded thread pool, off the request threads.
+
+    bcrypt releases the GIL while hashing, so ``workers`` threads use up to
+    that many cores; each gunicorn worker has its own pool, so it is sized
+    to its share of the cores. Hashes are Flask-Bcrypt compatible ("$2b$",
+    UTF-8 passwords). At most ``max_pending`` operations may be queued or
+    running; past that, callers wait up to ``queue_timeout`` seconds and
+    then get PasswordHasherBusy instead of piling up behind the pool.
+    With ``workers=0`` everything runs inline on the calling thread.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=None, max_pending=None, queue_timeout=2.0):
+        self.rounds = rounds
+        self.workers = 1 if workers is None else workers
+        self.max_pending = max_pending or 4 * max(self.workers, 1)
+        self.queue_timeout = queue_timeout
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Pool threads do not survive a fork; forked workers start their own.
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _pool(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Too many password operations in progress.")
+        try:
+            return self._pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password, rounds=None):
+        return self._run(_hash, password.encode("utf-8"), rounds or self.rounds)
+
+    def check(self, hashed, password):
+        if not hashed:
+            return False
+        return self._run(_check, password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed):
+        return hash_rounds(hashed) != self.rounds
+
+
+_hashers = {}
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """The pooled hasher inside requests; Celery tasks and scripts hash inline."""
+    pooled = has_request_context()
+    hasher = _hashers.get(pooled)
+    if hasher is None:
+        with _hasher_lock:
+            hasher = _hashers.get(pooled)
+            if hasher is None:
+                config = current_app.config
+                hasher = PasswordHasher(
+                    rounds=config["BCRYPT_LOG_ROUNDS"],
+                    workers=config["PASSWORD_HASH_WORKERS"] if pooled else 0,
+                    max_pending=config["PASSWORD_HASH_MAX_PENDING"],
+                    queue_timeout=config["PASSWORD_HASH_QUEUE_TIMEOUT"],
+                )
+                _hashers[pooled] = hasher
+    return hasher
+
+
+def benchmark(rounds_list=(10, 12), seconds=5.0, workers=None, concurrency=None):
+    """Logins per second (password checks) inline on one core and on the pool."""
+    import time
+
+    workers = workers or os.cpu_count() or 1
+    concurrency = concurrency or 4 * workers
+    report = {}
+    for rounds in rounds_list:
+        hashed = _hash(b"benchmark-password", rounds)
+        inline = PasswordHasher(rounds, workers=0)
+        pooled = PasswordHasher(rounds, workers=workers, max_pending=concurrency)
+        pooled.check(hashed, "warm-up")
+
+        results = {}
+        for name, hasher, threads in (("inline", inline, 1), ("pool", pooled, concurrency)):
+            deadline = time.perf_counter() + seconds
+            counts = [0] * threads
+
+            def run(slot):
+                while time.perf_counter() < deadline:
+                    hasher.check(hashed, "benchmark-password")
+                    counts[slot] += 1
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                list(executor.map(run, range(threads)))
+            results[name] = sum(counts) / (time.perf_counter() - started)
+
+        report[rounds] = {
+            "inline_logins_per_second": results["inline"],
+            "pool_logins_per_second": results["pool"],
+            "pool_logins_per_second_per_core": results["pool"] / workers,
+            "workers": workers,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt login throughput.")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    for rounds, row in benchmark(args.rounds, args.seconds, args.workers).items():
+        print(
+            f"cost {rounds}: inline {row['inline_logins_per_second']:.1f}/s, "
+            f"pool {row['pool_logins_per_second']:.1f}/s on {row['workers']} workers "
+            f"({row['pool_logins_per_second_per_core']:.1f}/s per core)"
+        )
@@ -1,11 +1,22 @@
-from .qa_chain import create_qa_chain
-from .gemini_api import query_gemini, reset_chat, get_chat_history
-from .gemini_llm import GeminiLLM
+from .engine import (
+    RetrievalEngine,
+    get_engine,
+    is_ready,
+    start_warm_up,
+    warm_up,
+    warm_up_status,
+)
+from .gemini_api import query_gemini, stream_gemini, reset_chat, get_chat_history
 
 __all__ = [
-    "create_qa_chain",
+    "RetrievalEngine",
+    "get_engine",
+    "is_ready",
+    "start_warm_up",
+    "warm_up",
+    "warm_up_status",
     "query_gemini",
+    "stream_gemini",
     "reset_chat",
     "get_chat_history",
-    "GeminiLLM",
 ]
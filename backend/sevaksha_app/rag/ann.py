@@ -0,0 +1,95 @@
+import os
+import time
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "pq")
+INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+
+DEFAULT_PARAMS = {
+    "flat": {},
+    "ivf": {"nlist": 1024, "nprobe": 16},
+    "hnsw": {"m": 32, "ef_construction": 200, "ef_search": 64},
+    "pq": {"nlist": 1024, "nprobe": 16, "m": 48, "nbits": 8},
+}
+
+
+def _largest_divisor(dimension, at_most):
+    return max(d for d in range(1, max(1, at_most) + 1) if dimension % d == 0)
+
+
+def build_index(vectors, index_type=INDEX_TYPE, **params):
+    """Builds and trains a FAISS index of the requested type over ``vectors``.
+
+    Returns the index and the parameters actually used: cluster counts and
+    code sizes are clamped to what the corpus can train, so a small catalog
+    still gets a valid (if degenerate) index of every type.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}.")
+    params = {**DEFAULT_PARAMS[index_type], **params}
+    count, dimension = vectors.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dimension)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+    else:
+        # faiss wants roughly 39 training points per centroid.
+        params["nlist"] = max(1, min(params["nlist"], count // 39))
+        params["nprobe"] = min(params["nprobe"], params["nlist"])
+        quantizer = faiss.IndexFlatL2(dimension)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dimension, params["nlist"])
+        else:
+            params["m"] = _largest_divisor(dimension, params["m"])
+            params["nbits"] = max(1, min(params["nbits"], int(np.log2(max(count, 2)))))
+            index = faiss.IndexIVFPQ(
+                quantizer, dimension, params["nlist"], params["m"], params["nbits"]
+            )
+        index.train(vectors)
+
+    index.add(vectors)
+    apply_search_params(index, index_type, params)
+    return index, {"type": index_type, **params}
+
+
+def apply_search_params(index, index_type, params):
+    """Restores query-time knobs that are not part of the serialized index."""
+    if index_type in ("ivf", "pq"):
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def evaluate_index(index, vectors, k=5, queries=256, seed=0):
+    """Recall@k against exact search and per-query latency, on perturbed corpus vectors."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.integers(0, len(vectors), size=min(queries, len(vectors) * 4))]
+    sample = sample + rng.normal(scale=0.05, size=sample.shape).astype(np.float32)
+    sample /= np.linalg.norm(sample, axis=1, keepdims=True)
+    k = min(k, len(vectors))
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(sample, k)
+
+    latencies = []
+    found = np.empty_like(truth)
+    for row, query in enumerate(sample):
+        started = time.perf_counter()
+        _, found[row : row + 1] = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+
+    recall = np.mean(
+        [len(set(a) & set(b)) / k for a, b in zip(found.tolist(), truth.tolist())]
+    )
+    latencies = np.asarray(latencies) * 1000.0
+    return {
+        f"recall_at_{k}": float(recall),
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "index_bytes": int(faiss.serialize_index(index).nbytes),
+        "queries": int(len(sample)),
+    }
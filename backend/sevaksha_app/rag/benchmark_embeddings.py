@@ -0,0 +1,104 @@
+import argparse
+import json
+import time
+import numpy as np
+from .data_loader import load_schemes_data
+from .embeddings import BACKENDS, create_embeddings
+
+SAMPLE_QUERIES = [
+    "farmer",
+    "housing",
+    "PMAY",
+    "pension",
+    "street vendors",
+    "widows of ex-servicemen",
+    "skill training",
+    "What schemes are available for unemployed youth?",
+    "Tell me about welfare programs for senior citizens",
+    "loan for starting a small business",
+    "insurance for unorganised workers",
+    "education support for children of soldiers",
+    "scholarship for daughters",
+    "health cover for poor families",
+    "rural employment guarantee",
+    "monthly pension after 60",
+]
+
+
+def _percentile(values, q):
+    return float(np.percentile(np.asarray(values) * 1000.0, q))
+
+
+def _top_k(query_vectors, document_vectors, k):
+    scores = query_vectors @ document_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def benchmark(backends=BACKENDS, k=5, rounds=5, batch_size=32):
+    """Compares query latency, batch throughput and retrieval agreement with the float model."""
+    documents = [doc.page_content for doc in load_schemes_data()]
+    queries = SAMPLE_QUERIES + [doc.split("\n", 1)[0] for doc in documents]
+
+    reference = create_embeddings("huggingface", cached=False)
+    document_vectors = np.asarray(reference.embed_documents(documents), dtype=np.float32)
+    reference_top = _top_k(
+        np.asarray(reference.embed_documents(queries), dtype=np.float32),
+        document_vectors,
+        k,
+    )
+
+    report = {}
+    for backend in backends:
+        if backend == "huggingface":
+            embeddings = reference
+        else:
+            embeddings = create_embeddings(backend, cached=False)
+        embeddings.embed_query(queries[0])
+
+        latencies = []
+        for _ in range(rounds):
+            for query in queries:
+                started = time.perf_counter()
+                embeddings.embed_query(query)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for start in range(0, len(documents), batch_size):
+                embeddings.embed_documents(documents[start : start + batch_size])
+        throughput = rounds * len(documents) / (time.perf_counter() - started)
+
+        query_vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+        top = _top_k(query_vectors, document_vectors, k)
+        overlap = np.mean(
+            [len(set(a) & set(b)) / k for a, b in zip(top, reference_top)]
+        )
+        report[backend] = {
+            "query_p50_ms": _percentile(latencies, 50),
+            "query_p95_ms": _percentile(latencies, 95),
+            "queries_per_second": len(latencies) / sum(latencies),
+            "documents_per_second": throughput,
+            "top1_agreement": float(np.mean(top[:, 0] == reference_top[:, 0])),
+            f"overlap_at_{k}": float(overlap),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark embedding backends on the schemes corpus."
+    )
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = benchmark(args.backends, k=args.k, rounds=args.rounds)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        columns = list(next(iter(report.values())))
+        print(f"{'backend':<12}" + "".join(f"{c:>22}" for c in columns))
+        for backend, row in report.items():
+            print(f"{backend:<12}" + "".join(f"{row[c]:>22.3f}" for c in columns))
@@ -1,21 +1,167 @@
-import pickle
-from langchain.vectorstores import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from data_loader import load_schemes_data
+import json
+import numpy as np
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from .ann import INDEX_TYPE, INDEX_TYPES, build_index, evaluate_index
+from .data_loader import load_schemes_data
+from .vector_store import (
+    EMBEDDING_MODEL,
+    FORMAT_VERSION,
+    StaleIndexError,
+    content_hash,
+    load_embeddings,
+    read_metadata,
+    save_vector_store,
+    source_hash,
+)
 
+BATCH_SIZE = 64
 
-def build_faiss_index():
-    """Builds a FAISS index from the schemes data and saves it to a file."""
-    docs = load_schemes_data()
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
+
+def _previous_build():
+    try:
+        metadata = read_metadata()
+    except StaleIndexError:
+        return None, {}
+    if (
+        metadata.get("format_version") != FORMAT_VERSION
+        or metadata.get("embedding_model") != EMBEDDING_MODEL
+    ):
+        return metadata, {}
+    return metadata, load_embeddings(metadata)
+
+
+def _scheme_hashes(documents):
+    hashes = {}
+    for doc in documents:
+        hashes.setdefault(doc["metadata"]["scheme_key"], []).append(doc["id"])
+    return {key: content_hash("".join(ids)) for key, ids in hashes.items()}
+
+
+def build_faiss_index(
+    full=False,
+    batch_size=BATCH_SIZE,
+    index_type=INDEX_TYPE,
+    index_options=None,
+    compare=False,
+):
+    """Builds the FAISS index, re-embedding only documents whose content changed.
+
+    Also measures recall@k and query latency of the chosen index type
+    against exact search and stores that report in the metadata; with
+    ``compare`` the same report is printed for every index type first.
+    """
+    source_sha256 = source_hash()
+    documents = []
+    for doc in load_schemes_data():
+        documents.append(
+            {
+                "id": content_hash(
+                    json.dumps(doc.metadata, sort_keys=True) + "\n" + doc.page_content
+                ),
+                "page_content": doc.page_content,
+                "metadata": doc.metadata,
+            }
+        )
+
+    previous, cached = _previous_build()
+    if full:
+        cached = {}
+
+    missing = [doc for doc in documents if doc["id"] not in cached]
+    if missing:
+        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start : start + batch_size]
+            vectors = embeddings.embed_documents([doc["page_content"] for doc in batch])
+            for doc, vector in zip(batch, vectors):
+                cached[doc["id"]] = np.asarray(vector, dtype=np.float32)
+
+    vectors = np.ascontiguousarray(
+        np.stack([cached[doc["id"]] for doc in documents]).astype(np.float32)
     )
-    vector_store = FAISS.from_documents(docs, embeddings)
+    if compare:
+        for candidate in INDEX_TYPES:
+            candidate_index, candidate_params = build_index(vectors, candidate)
+            print(
+                f"{candidate:<6} {candidate_params}: "
+                + ", ".join(
+                    f"{key}={round(value, 3)}"
+                    for key, value in evaluate_index(candidate_index, vectors).items()
+                )
+            )
 
-    with open("vectorstore.pkl", "wb") as f:
-        pickle.dump(vector_store, f)
-    print("FAISS index built and saved as 'vectorstore.pkl'.")
+    index, index_params = build_index(vectors, index_type, **(index_options or {}))
+    report = evaluate_index(index, vectors)
+
+    schemes = _scheme_hashes(documents)
+    previous_schemes = (previous or {}).get("build", {}).get("schemes", {})
+    build = {
+        "previous_version": (previous or {}).get("version"),
+        "schemes": schemes,
+        "added": sorted(set(schemes) - set(previous_schemes)),
+        "changed": sorted(
+            key
+            for key in set(schemes) & set(previous_schemes)
+            if schemes[key] != previous_schemes[key]
+        ),
+        "removed": sorted(set(previous_schemes) - set(schemes)),
+        "embedded_documents": len(missing),
+        "reused_documents": len(documents) - len(missing),
+        "report": report,
+    }
+
+    metadata = save_vector_store(
+        index, index_params, documents, vectors, source_sha256, build
+    )
+    print(
+        f"FAISS index {metadata['version']} built from {len(documents)} documents "
+        f"({len(missing)} embedded, {len(documents) - len(missing)} reused; "
+        f"{len(build['added'])} schemes added, {len(build['changed'])} changed, "
+        f"{len(build['removed'])} removed) and saved as '{metadata['index_file']}'."
+    )
+    print(
+        f"{index_params['type']} index {index_params}: "
+        + ", ".join(f"{key}={round(value, 3)}" for key, value in report.items())
+    )
+    return metadata
 
 
 if __name__ == "__main__":
-    build_faiss_index()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the schemes vector store.")
+    parser.add_argument(
+        "--full", action="store_true", help="re-embed every document from scratch"
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=INDEX_TYPE)
+    parser.add_argument("--nlist", type=int, help="IVF/PQ: number of clusters")
+    parser.add_argument("--nprobe", type=int, help="IVF/PQ: clusters visited per query")
+    parser.add_argument("--m", type=int, help="HNSW: links per node, PQ: sub-quantizers")
+    parser.add_argument("--nbits", type=int, help="PQ: bits per sub-quantizer code")
+    parser.add_argument("--ef-construction", type=int, help="HNSW: build-time beam width")
+    parser.add_argument("--ef-search", type=int, help="HNSW: query-time beam width")
+    parser.add_argument(
+        "--compare", action="store_true", help="report recall/latency of every index type"
+    )
+    args = parser.parse_args()
+
+    options = {
+        key: value
+        for key, value in {
+            "nlist": args.nlist,
+            "nprobe": args.nprobe,
+            "m": args.m,
+            "nbits": args.nbits,
+            "ef_construction": args.ef_construction,
+            "ef_search": args.ef_search,
+        }.items()
+        if value is not None
+    }
+    build_faiss_index(
+        full=args.full,
+        batch_size=args.batch_size,
+        index_type=args.index_type,
+        index_options=options,
+        compare=args.compare,
+    )
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text):
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class SemanticCache:
+    """Two-tier response cache: an in-process LRU in front of Redis.
+
+    Lookups first try the normalized query text (locally, then in Redis) and
+    then fall back to the cached query whose embedding is most similar, if
+    its cosine similarity clears ``similarity_threshold``. Every entry is
+    tagged with the index version, so a rebuilt index never serves answers
+    computed against the old catalog.
+    """
+
+    def __init__(
+        self,
+        embed,
+        max_entries=1024,
+        similarity_threshold=0.92,
+        ttl=86400,
+        redis_client=None,
+        namespace="sevaksha:rag",
+    ):
+        self.embed = embed
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.redis = redis_client
+        self.namespace = namespace
+        self.version = None
+        self._entries = OrderedDict()
+        self._keys = []
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "redis_errors": 0,
+        }
+
+    def _redis_key(self, version, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{version}:{digest}"
+
+    def _set_version(self, version):
+        if version != self.version:
+            self.version = version
+            self._entries.clear()
+            self._matrix = None
+
+    def _remember(self, key, vector, value):
+        self._entries[key] = (vector, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def _similar(self, vector):
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            if not self._keys:
+                return None
+            self._matrix = np.stack([self._entries[key][0] for key in self._keys])
+        if not self._keys:
+            return None
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        key = self._keys[best]
+        self._entries.move_to_end(key)
+        return self._entries[key][1]
+
+    def _embed(self, text):
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, query, version):
+        key = normalize_query(query)
+        with self._lock:
+            self._set_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["local_hits"] += 1
+                return entry[1]
+
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(self._redis_key(version, key))
+            except Exception:
+                cached = None
+                self._stats["redis_errors"] += 1
+            if cached is not None:
+                value = json.loads(cached)
+                vector = self._embed(key)
+                with self._lock:
+                    if self.version == version:
+                        self._remember(key, vector, value)
+                    self._stats["redis_hits"] += 1
+                return value
+
+        vector = self._embed(key)
+        with self._lock:
+            value = self._similar(vector) if self.version == version else None
+            if value is not None:
+                self._stats["semantic_hits"] += 1
+                return value
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, query, version, value):
+        key = normalize_query(query)
+        vector = self._embed(key)
+        with self._lock:
+            self._set_version(version)
+            self._remember(key, vector, value)
+
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    self._redis_key(version, key), json.dumps(value), ex=self.ttl
+                )
+            except Exception:
+                self._stats["redis_errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["version"] = self.version
+        hits = stats["local_hits"] + stats["redis_hits"] + stats["semantic_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        stats["miss_ratio"] = stats["misses"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", 1000))
+SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", 3600))
+MAX_TURNS = int(os.getenv("CHAT_MAX_TURNS", 6))
+SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", 1500))
+# Sessions are updated under one of these locks, picked by key.
+LOCK_STRIPES = 64
+REDIS_UPDATE_ATTEMPTS = 10
+
+
+def _empty_session():
+    return {"summary": "", "pending": [], "turns": []}
+
+
+class ChatSessionStore:
+    """Chat history per (profile, user), bounded in sessions, age and turns.
+
+    Sessions live in an in-process LRU that drops the least recently used
+    session beyond ``max_sessions`` and any session idle for ``ttl``
+    seconds. With a Redis client they are also written to Redis under the
+    same TTL, so any worker or node can continue a conversation. Updates
+    to one session are serialized: by a lock within the process and by
+    WATCH/MULTI in Redis. Only the last ``max_turns`` question/answer pairs
+    are kept verbatim; older ones wait in ``pending`` until a background
+    thread has folded them into a running summary with ``summarize``.
+    """
+
+    def __init__(
+        self,
+        max_sessions=MAX_SESSIONS,
+        ttl=SESSION_TTL,
+        max_turns=MAX_TURNS,
+        summarize=None,
+        summary_max_chars=SUMMARY_MAX_CHARS,
+        redis_client=None,
+        namespace="sevaksha:chat",
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.summarize = summarize
+        self.summary_max_chars = summary_max_chars
+        self.redis = redis_client
+        self.namespace = namespace
+        self.redis_errors = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._summarizing = set()
+
+    def _key(self, profile, user_id):
+        return f"{self.namespace}:{profile}:{user_id}"
+
+    def _evict(self, now):
+        while self._sessions:
+            _, expires_at = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, profile, user_id):
+        key = self._key(profile, user_id)
+        now = time.monotonic()
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(key)
+                if raw is not None:
+                    return dict(_empty_session(), **json.loads(raw))
+            except Exception:
+                self.redis_errors += 1
+            else:
+                return _empty_session()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None or entry[1] <= now:
+                self._sessions.pop(key, None)
+                return _empty_session()
+            self._sessions.move_to_end(key)
+            session = entry[0]
+            return {
+                "summary": session["summary"],
+                "pending": list(session["pending"]),
+                "turns": list(session["turns"]),
+            }
+
+    def _put_local(self, key, session):
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[key] = (session, now + self.ttl)
+            self._sessions.move_to_end(key)
+            self._evict(now)
+
+    def _update_redis(self, key, change):
+        from redis.exceptions import WatchError
+
+        with self.redis.pipeline() as pipe:
+            for _ in range(REDIS_UPDATE_ATTEMPTS):
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    session = _empty_session()
+                    if raw is not None:
+                        session.update(json.loads(raw))
+                    change(session)
+                    pipe.multi()
+                    pipe.set(key, json.dumps(session), ex=self.ttl)
+                    pipe.execute()
+                    return session
+                except WatchError:
+                    continue
+        raise RuntimeError(f"Chat session {key} kept changing during the update.")
+
+    def _update(self, profile, user_id, change):
+        """Applies ``change`` to the stored session without losing concurrent updates."""
+        key = self._key(profile, user_id)
+        with self._key_locks[hash(key) % LOCK_STRIPES]:
+            session = None
+            if self.redis is not None:
+                try:
+                    session = self._update_redis(key, change)
+                except Exception as e:
+                    self.redis_errors += 1
+                    print(f"Chat session update in Redis failed: {e}")
+            if session is None:
+                session = self.get(profile, user_id)
+                change(session)
+            self._put_local(key, session)
+        return session
+
+    def append(self, profile, user_id, question, answer):
+        """Records one exchange; turns that fall off the window are summarized in the background."""
+
+        def add_turns(session):
+            session["turns"].extend(
+                [
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": answer},
+                ]
+            )
+            overflow = len(session["turns"]) - 2 * self.max_turns
+            if overflow > 0:
+                # Fold half the window at once so the summarizer runs every few turns, not every turn.
+                overflow = max(overflow, 2 * (self.max_turns // 2))
+                session["pending"] += session["turns"][:overflow]
+                session["turns"] = session["turns"][overflow:]
+
+        session = self._update(profile, user_id, add_turns)
+        if session["pending"]:
+            self._start_summary(profile, user_id, session)
+        return session
+
+    def _start_summary(self, profile, user_id, session):
+        key = self._key(profile, user_id)
+        with self._lock:
+            if key in self._summarizing:
+                return
+            self._summarizing.add(key)
+        threading.Thread(
+            target=self._fold_pending,
+            args=(profile, user_id, session["summary"], session["pending"]),
+            name="chat-summary",
+            daemon=True,
+        ).start()
+
+    def _fold_pending(self, profile, user_id, summary, pending):
+        try:
+            # Turns that overflowed while a summary was being written are folded next.
+            while pending:
+                folded = self._summarize(summary, pending)
+
+                def apply(session, pending=pending, folded=folded):
+                    # Only if nobody folded or reset these turns in the meantime.
+                    if session["pending"][: len(pending)] == pending:
+                        session["summary"] = folded
+                        session["pending"] = session["pending"][len(pending) :]
+
+                session = self._update(profile, user_id, apply)
+                summary, pending = session["summary"], session["pending"]
+        except Exception as e:
+            print(f"Chat summary for {profile}:{user_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._summarizing.discard(self._key(profile, user_id))
+
+    def _summarize(self, summary, turns):
+        summary_text = None
+        if self.summarize is not None:
+            try:
+                summary_text = self.summarize(summary, turns)
+            except Exception as e:
+                print(f"Chat summary failed, truncating instead: {e}")
+        if summary_text is None:
+            summary_text = "\n".join(
+                [summary] + [f"{turn['role']}: {turn['content']}" for turn in turns]
+            )
+        summary_text = summary_text.strip()
+        # Keep the most recent part of the summary when it outgrows its budget.
+        return summary_text[-self.summary_max_chars :]
+
+    def reset(self, profile, user_id):
+        key = self._key(profile, user_id)
+        with self._lock:
+            self._sessions.pop(key, None)
+        if self.redis is not None:
+            try:
+                self.redis.delete(key)
+            except Exception:
+                self.redis_errors += 1
+
+    def stats(self):
+        return {
+            "sessions": len(self._sessions),
+            "backend": "redis" if self.redis is not None else "memory",
+            "redis_errors": self.redis_errors,
+        }
@@ -0,0 +1,104 @@
+import os
+import numpy as np
+
+SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "mmr")
+SEARCH_TYPES = ("mmr", "similarity")
+TOP_K = int(os.getenv("RETRIEVAL_K", 4))
+FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", 20))
+MMR_LAMBDA = float(os.getenv("RETRIEVAL_MMR_LAMBDA", 0.5))
+SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", 0.2))
+DUPLICATE_SIMILARITY = float(os.getenv("RETRIEVAL_DUPLICATE_SIMILARITY", 0.97))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1200))
+MIN_PARTIAL_TOKENS = 64
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def mmr(query_vector, vectors, k=TOP_K, lambda_mult=MMR_LAMBDA):
+    """Indices into ``vectors`` picked by maximal marginal relevance, best first."""
+    if not len(vectors):
+        return []
+    relevance = vectors @ query_vector
+    selected = [int(np.argmax(relevance))]
+    redundancy = vectors @ vectors[selected[0]]
+    while len(selected) < min(k, len(vectors)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return selected
+
+
+def select_candidates(
+    query_vector,
+    candidates,
+    vectors,
+    search_type=SEARCH_TYPE,
+    k=TOP_K,
+    lambda_mult=MMR_LAMBDA,
+    score_threshold=SCORE_THRESHOLD,
+    duplicate_similarity=DUPLICATE_SIMILARITY,
+):
+    """Filters, de-duplicates and orders (document, similarity) candidates.
+
+    Candidates under ``score_threshold`` cosine similarity are dropped, as
+    are documents whose text or vector duplicates one already kept, before
+    MMR (or plain similarity order) picks at most ``k``.
+    """
+    kept, kept_vectors, seen = [], [], set()
+    for (doc, similarity), vector in zip(candidates, vectors):
+        if similarity < score_threshold:
+            continue
+        text = " ".join(doc.page_content.split())
+        if text in seen:
+            continue
+        if kept_vectors and max(float(v @ vector) for v in kept_vectors) >= duplicate_similarity:
+            continue
+        seen.add(text)
+        kept.append((doc, similarity))
+        kept_vectors.append(vector)
+    if not kept:
+        return []
+    if search_type == "mmr":
+        order = mmr(query_vector, np.stack(kept_vectors), k, lambda_mult)
+    else:
+        order = range(min(k, len(kept)))
+    return [kept[position] for position in order]
+
+
+def build_context(documents, budget=CONTEXT_TOKEN_BUDGET):
+    """Joins document texts in order until ``budget`` estimated tokens are used.
+
+    A document that does not fit is cut short when enough of the budget is
+    left for it to be useful, and dropped otherwise.
+    """
+    parts, used = [], 0
+    for doc in documents:
+        text = doc.page_content
+        cost = estimate_tokens(text)
+        if used + cost > budget:
+            remaining = budget - used
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            lines, partial = [], 0
+            for line in text.splitlines():
+                cost = estimate_tokens(line + "\n")
+                if partial + cost > remaining:
+                    # Cut an over-long field at a word boundary rather than losing it whole.
+                    room = (remaining - partial - 1) * 4
+                    if room > 0 and lines:
+                        lines.append(line[:room].rsplit(" ", 1)[0] + " ...")
+                    break
+                lines.append(line)
+                partial += cost
+            if lines:
+                parts.append("\n".join(lines))
+                used += estimate_tokens(parts[-1])
+            break
+        parts.append(text)
+        used += cost
+    return "\n\n".join(parts), len(parts)
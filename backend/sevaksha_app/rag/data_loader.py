@@ -1,24 +1,93 @@
-from langchain.text_splitter import CharacterTextSplitter
 from langchain.docstore.document import Document
+import json
 import os
 
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "data"
+)
+SCHEMES_JSON_PATH = os.path.join(DATA_DIR, "schemes.json")
 
-def load_schemes_data(file_path="schemes.txt"):
-    """Reads and splits schemes-related data into smaller chunks."""
+# Schemes longer than this are split into field-aware sub-documents that
+# each repeat the scheme name, instead of being cut at arbitrary offsets.
+MAX_DOCUMENT_CHARS = 1500
+
+FIELD_GROUPS = (
+    (
+        ("scheme_name", "Scheme Name"),
+        ("target_occupation", "Target Occupation"),
+        ("min_age", "Minimum Age"),
+        ("max_age", "Maximum Age"),
+        ("income_limit", "Income Limit"),
+        ("gender", "Gender"),
+        ("marital_status", "Marital Status"),
+        ("eligibility_criteria", "Eligibility Criteria"),
+    ),
+    (
+        ("scheme_description", "Scheme Description"),
+        ("benefits", "Benefits"),
+    ),
+    (
+        ("required_documents", "Required Documents"),
+        ("application_process", "Application Process"),
+        ("application_link", "Application Link"),
+        ("language_support", "Language Support"),
+    ),
+)
+
+
+def scheme_key(name):
+    """Normalized scheme name used to match index documents to catalog rows."""
+    return " ".join((name or "").lower().split())
+
+
+def load_schemes(file_path=SCHEMES_JSON_PATH):
     with open(file_path, "r", encoding="utf-8") as file:
-        text = file.read()
+        return json.load(file)
+
 
-    text_splitter = CharacterTextSplitter(chunk_size=200, chunk_overlap=20)
-    chunks = text_splitter.split_text(text)
+def _render(scheme, fields):
+    return "\n".join(
+        f"{label}: {scheme.get(field)}"
+        for field, label in fields
+        if scheme.get(field) not in (None, "")
+    )
+
+
+def scheme_documents(scheme):
+    """One document per scheme, or one per field group when the scheme is long."""
+    metadata = {
+        "scheme_key": scheme_key(scheme["scheme_name"]),
+        "scheme_name": scheme["scheme_name"],
+    }
+    fields = [field for group in FIELD_GROUPS for field in group]
+    text = _render(scheme, fields)
+    if len(text) <= MAX_DOCUMENT_CHARS:
+        return [Document(page_content=text, metadata=dict(metadata, part=0))]
 
-    return [Document(page_content=chunk) for chunk in chunks]
+    header = f"Scheme Name: {scheme['scheme_name']}"
+    documents = []
+    for part, group in enumerate(FIELD_GROUPS):
+        body = _render(scheme, [f for f in group if f[0] != "scheme_name"])
+        if body:
+            documents.append(
+                Document(
+                    page_content=f"{header}\n{body}",
+                    metadata=dict(metadata, part=part),
+                )
+            )
+    return documents
+
+
+def load_schemes_data(file_path=SCHEMES_JSON_PATH):
+    """Reads the schemes catalog into scheme-aligned documents."""
+    return [
+        document
+        for scheme in load_schemes(file_path)
+        if scheme.get("is_active", True)
+        for document in scheme_documents(scheme)
+    ]
 
 
 if __name__ == "__main__":
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-    data_path = os.path.join(
-        project_root, "sevaksha_app", "static", "data", "schemes.txt"
-    )
-    docs = load_schemes_data(data_path)
-    print(f"Loaded {len(docs)} document chunks from schemes data.")
+    docs = load_schemes_data()
+    print(f"Loaded {len(docs)} documents from schemes data.")
@@ -0,0 +1,321 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from .data_loader import DATA_DIR
+from .vector_store import EMBEDDING_MODEL
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(DATA_DIR, "onnx_model"))
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model-int8.onnx"
+BACKENDS = ("huggingface", "onnx", "onnx-int8")
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096))
+BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 3))
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", 32))
+BATCH_TIMEOUT = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", 5))
+# How often an idle batcher thread checks whether its batcher is still in use.
+IDLE_CHECK_SECONDS = 30
+
+# One fork hook for every live instance; per-instance hooks could never be
+# unregistered and would keep each instance and its model alive for good.
+_fork_safe = weakref.WeakSet()
+
+
+def _after_fork():
+    for instance in list(_fork_safe):
+        instance._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+class OnnxEmbeddings(Embeddings):
+    """MiniLM sentence embeddings on ONNX Runtime's CPU provider.
+
+    Reproduces the sentence-transformers pipeline of the float model (mean
+    pooling over the attention mask, then L2 normalization) so vectors are
+    interchangeable with the ones the index was built from.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=True, max_length=256, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} not found. Run `python -m sevaksha_app.rag.embeddings` first."
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+
+    def _encode(self, texts):
+        tokens = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        feed = {
+            name: tokens[name].astype(np.int64)
+            for name in self.input_names
+            if name in tokens
+        }
+        hidden = self.session.run(None, feed)[0]
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts):
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
+
+
+def _serve(batcher_ref, jobs):
+    """The batcher thread; it holds its MicroBatcher weakly and exits once that is gone."""
+    while True:
+        try:
+            first = jobs.get(timeout=IDLE_CHECK_SECONDS)
+        except queue.Empty:
+            if batcher_ref() is None:
+                return
+            continue
+        batcher = batcher_ref()
+        if batcher is None:
+            return
+        batcher._encode(batcher._collect(first))
+        del batcher
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests for up to ``max_wait`` seconds and encodes them as one batch.
+
+    ``submit`` raises concurrent.futures.TimeoutError when no batch has
+    answered within ``timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        encode_batch,
+        max_batch=MAX_BATCH_SIZE,
+        max_wait=BATCH_WAIT_MS / 1000,
+        timeout=BATCH_TIMEOUT,
+    ):
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.batches = 0
+        self.encoded = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        _fork_safe.add(self)
+
+    def _after_fork(self):
+        # The worker thread does not survive a fork and the queue's locks may be held.
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=_serve,
+                        args=(weakref.ref(self), self._queue),
+                        name="embedding-batcher",
+                        daemon=True,
+                    )
+                    self._thread.start()
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        self._ensure_worker()
+        return future.result(timeout=self.timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _encode(self, batch):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(texts, self.encode_batch(texts)))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.encoded += len(texts)
+        for text, future in batch:
+            future.set_result(vectors[text])
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Bounded LRU of query vectors in front of a micro-batched embedding backend."""
+
+    def __init__(
+        self,
+        embeddings,
+        max_entries=QUERY_CACHE_SIZE,
+        batch_wait=BATCH_WAIT_MS / 1000,
+        max_batch=MAX_BATCH_SIZE,
+    ):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.batch_timeouts = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        _fork_safe.add(self)
+        self._batcher = (
+            MicroBatcher(embeddings.embed_documents, max_batch, batch_wait)
+            if batch_wait > 0
+            else None
+        )
+
+    def _after_fork(self):
+        # Cached vectors stay shared copy-on-write; only the lock is replaced.
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        # The MiniLM tokenizer is uncased, so case and spacing never change the vector.
+        key = " ".join(text.lower().split())
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        vector = None
+        if self._batcher is not None:
+            try:
+                vector = self._batcher.submit(key)
+            except FutureTimeoutError:
+                # A stuck or dead batcher thread must not hang the request.
+                self.batch_timeouts += 1
+                print(f"Embedding batch timed out after {self._batcher.timeout}s, encoding directly")
+        if vector is None:
+            vector = self.embeddings.embed_query(key)
+
+        with self._lock:
+            self._cache[key] = vector
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return vector
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+        if self._batcher is not None:
+            stats["batches"] = self._batcher.batches
+            stats["batch_timeouts"] = self.batch_timeouts
+            stats["mean_batch_size"] = (
+                self._batcher.encoded / self._batcher.batches
+                if self._batcher.batches
+                else 0.0
+            )
+        return stats
+
+
+def create_embeddings(backend=EMBEDDING_BACKEND, cached=True):
+    """Returns the query embedding backend selected by EMBEDDING_BACKEND."""
+    if backend == "huggingface":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    elif backend in ("onnx", "onnx-int8"):
+        embeddings = OnnxEmbeddings(quantized=backend == "onnx-int8")
+    else:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}', expected one of {BACKENDS}."
+        )
+    return CachedQueryEmbeddings(embeddings) if cached else embeddings
+
+
+def export_onnx_model(model_name=EMBEDDING_MODEL, model_dir=ONNX_MODEL_DIR):
+    """Exports the transformer to ONNX and writes a dynamically int8-quantized copy."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(model_dir)
+
+    sample = tokenizer(["welfare schemes for farmers"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+
+    quantize_dynamic(
+        model_path,
+        os.path.join(model_dir, ONNX_QUANTIZED_MODEL_FILE),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"Exported {model_name} to {model_dir} (float and int8 ONNX).")
+
+
+if __name__ == "__main__":
+    export_onnx_model()
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+import numpy as np
+from flask import has_app_context
+from .context import FETCH_K, build_context, estimate_tokens, select_candidates
+from .data_loader import scheme_key
+from .embeddings import create_embeddings
+from .gemini_api import query_gemini, stream_gemini
+from .prompts import PROFILES, QA_PROMPT
+from .vector_store import (
+    StaleIndexError,
+    load_document_vectors,
+    load_index,
+    vector_store_from_index,
+)
+
+WARM_UP_RETRY_SECONDS = float(os.getenv("RAG_WARM_UP_RETRY_SECONDS", 60))
+
+
+class RetrievalEngine:
+    """Embedding model and index shared by every prompt profile."""
+
+    def __init__(self):
+        # The index is validated first: a stale one must fail before the model is loaded.
+        index, self.metadata = load_index()
+        self.document_vectors = load_document_vectors(self.metadata)
+        self.embeddings = create_embeddings()
+        self.vector_store = vector_store_from_index(self.embeddings, index, self.metadata)
+        self.scheme_ids = {}
+        self.catalog_bound = False
+        self._context_stats = {
+            "prompts": 0,
+            "prompt_tokens": 0,
+            "max_prompt_tokens": 0,
+            "context_documents": 0,
+            "empty_contexts": 0,
+        }
+
+    @property
+    def version(self):
+        return self.metadata["version"]
+
+    def bind_catalog(self):
+        """Stamps each indexed document with the scheme_id of its catalog row."""
+        from sevaksha_app.models import WelfareScheme
+
+        rows = WelfareScheme.query.with_entities(
+            WelfareScheme.scheme_id, WelfareScheme.scheme_name
+        ).all()
+        scheme_ids = {scheme_key(name): scheme_id for scheme_id, name in rows}
+        for doc_id in self.vector_store.index_to_docstore_id.values():
+            doc = self.vector_store.docstore.search(doc_id)
+            doc.metadata["scheme_id"] = scheme_ids.get(doc.metadata.get("scheme_key"))
+        self.scheme_ids = scheme_ids
+        self.catalog_bound = True
+
+    def scheme_ids_for_names(self, names):
+        """Maps scheme names (e.g. from "- Name" lines of an answer) to catalog ids."""
+        ids = []
+        for name in names:
+            scheme_id = self.scheme_ids.get(scheme_key(name))
+            if scheme_id is not None and scheme_id not in ids:
+                ids.append(scheme_id)
+        return ids
+
+    def retrieve(self, question, fetch_k=FETCH_K):
+        """Relevant, non-redundant documents for ``question`` with their cosine similarity."""
+        query_vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        _, positions = self.vector_store.index.search(query_vector[None, :], fetch_k)
+        candidates, vectors = [], []
+        for position in positions[0]:
+            if position < 0:
+                continue
+            doc_id = self.vector_store.index_to_docstore_id[int(position)]
+            vector = np.asarray(self.document_vectors[position], dtype=np.float32)
+            candidates.append(
+                (self.vector_store.docstore.search(doc_id), float(vector @ query_vector))
+            )
+            vectors.append(vector)
+        return select_candidates(query_vector, candidates, vectors)
+
+    def build_prompt(self, question):
+        """Stuffs the retrieved scheme documents, within the context budget, into one prompt."""
+        documents = [doc for doc, _ in self.retrieve(question)]
+        context, used = build_context(documents)
+        prompt = QA_PROMPT.format(context=context, question=question)
+
+        tokens = estimate_tokens(prompt)
+        stats = self._context_stats
+        stats["prompts"] += 1
+        stats["prompt_tokens"] += tokens
+        stats["max_prompt_tokens"] = max(stats["max_prompt_tokens"], tokens)
+        stats["context_documents"] += used
+        stats["empty_contexts"] += not used
+        return prompt
+
+    def context_stats(self):
+        stats = dict(self._context_stats)
+        prompts = stats["prompts"]
+        stats["mean_prompt_tokens"] = stats["prompt_tokens"] / prompts if prompts else 0.0
+        stats["mean_context_documents"] = (
+            stats["context_documents"] / prompts if prompts else 0.0
+        )
+        return stats
+
+    def answer(self, question, profile="search", user_id=None):
+        """Answers ``question``; with a ``user_id`` the exchange joins that user's chat history."""
+        if profile not in PROFILES:
+            raise KeyError(f"Unknown prompt profile '{profile}'.")
+        return query_gemini(
+            self.build_prompt(question), profile=profile, user_id=user_id, question=question
+        )
+
+    def stream(self, question, profile="chat", user_id=None):
+        """Yields the answer text as Gemini produces it."""
+        if profile not in PROFILES:
+            raise KeyError(f"Unknown prompt profile '{profile}'.")
+        return stream_gemini(
+            self.build_prompt(question), profile=profile, user_id=user_id, question=question
+        )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RetrievalEngine()
+    if not _engine.catalog_bound and has_app_context():
+        with _engine_lock:
+            if not _engine.catalog_bound:
+                _engine.bind_catalog()
+    return _engine
+
+
+_warm_up = {"state": "idle", "error": None, "seconds": None, "failed_at": None}
+_warm_up_lock = threading.Lock()
+
+
+def start_warm_up(app):
+    """Loads the engine on a background thread so the app can serve requests meanwhile.
+
+    A stale index is never retried; other failures are retried at most
+    every RAG_WARM_UP_RETRY_SECONDS.
+    """
+    with _warm_up_lock:
+        state = _warm_up["state"]
+        if state in ("warming", "ready", "stale"):
+            return
+        if (
+            state == "failed"
+            and time.monotonic() - _warm_up["failed_at"] < WARM_UP_RETRY_SECONDS
+        ):
+            return
+        _warm_up.update(state="warming", error=None)
+    threading.Thread(target=warm_up, args=(app,), name="rag-warm-up", daemon=True).start()
+
+
+def warm_up(app):
+    """Loads the engine and primes the query path.
+
+    A missing or stale index is never rebuilt here: every worker would
+    race to write the same files. Warm-up stops in the "stale" state
+    instead, readiness stays 503 with the error until the process is
+    restarted, and the index has to be rebuilt offline with
+    ``python -m sevaksha_app.rag.build_vector_store``.
+    """
+    _warm_up.update(state="warming", error=None)
+    started = time.perf_counter()
+    try:
+        with app.app_context():
+            engine = get_engine()
+            # Loads the embedding model weights and primes the query path.
+            engine.retrieve("welfare schemes for farmers")
+    except StaleIndexError as e:
+        print(f"RAG warm-up failed, rebuild the index offline: {e}")
+        _warm_up.update(state="stale", error=str(e))
+        return False
+    except Exception as e:
+        print(f"RAG warm-up failed: {e}")
+        _warm_up.update(state="failed", error=str(e), failed_at=time.monotonic())
+        return False
+    _warm_up.update(state="ready", seconds=round(time.perf_counter() - started, 3))
+    print(f"RAG engine ready in {_warm_up['seconds']}s.")
+    return True
+
+
+def is_ready():
+    return _warm_up["state"] == "ready"
+
+
+def warm_up_status():
+    return dict(_warm_up)
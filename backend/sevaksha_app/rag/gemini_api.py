@@ -1,81 +1,102 @@
 import google.generativeai as genai
 import os
+import threading
 from dotenv import load_dotenv
+from .chat_sessions import CHAT_SESSION_BACKEND, ChatSessionStore
+from .prompts import PROFILES, SUMMARY_PROMPT
+from .providers import create_provider
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = "gemini-2.0-flash-exp"
 genai.configure(api_key=GEMINI_API_KEY)
+# Forked workers get their own transport instead of the parent's gRPC channel.
+os.register_at_fork(after_in_child=lambda: genai.configure(api_key=GEMINI_API_KEY))
 
-_chat_session = None
-_chat_history = []
+client = create_provider(model_name=GEMINI_MODEL)
+_session_store = None
+_session_store_lock = threading.Lock()
 
-def query_gemini(prompt):
+def _reset_session_store():
+    global _session_store, _session_store_lock
+    _session_store = None
+    _session_store_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_session_store)
+
+def query_gemini(prompt, profile="search", user_id=None, question=None):
     try:
-        return _extracted_from_query_gemini_7(prompt)
+        return _extracted_from_query_gemini_7(prompt, profile, user_id, question)
     except Exception as e:
-        _chat_session = None
-        _chat_history = []
         return f"❌ API Error: {e}"
 
-def _extracted_from_query_gemini_7(prompt):
-    global _chat_session, _chat_history
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
-
-    safety_settings = {
-        "HARASSMENT": "block_none",
-        "HATE_SPEECH": "block_none",
-        "SEXUALLY_EXPLICIT": "block_none",
-        "DANGEROUS_CONTENT": "block_none",
-    }
-
-    if _chat_session is None:
-        system_prompt = """You are a helpful assistant that provides information about Indian government welfare schemes.
-
-You are restricted to ONLY use the content from your internal database, which is built from officially curated welfare schemes.
-
-Your goal is to:
-- Search and match the most relevant scheme(s) when a user enters a keyword or question.
-- Return only the names of the matching schemes, each on a new line.
-- Never hallucinate, fabricate, or add information not found in the database.
-
-If the user types a keyword (e.g., "farmer", "housing", "PMAY"), find and return all schemes where that keyword appears in any field (like name, occupation, benefits, or eligibility).
-
-If the user types a question (e.g., "What schemes are available for unemployed youth?", "Tell me about welfare programs for senior citizens"), intelligently extract the intent and retrieve matching scheme names from the database.
-
-Respond with only the **scheme names**, each prefixed by a bullet point (`- `), in the following **exact format**:
-
-- <Scheme Name 1>  
-- <Scheme Name 2>  
-- <Scheme Name 3>  
-...
-
-Do not add introductions, summaries, or explanations.
-
-If no schemes match the query, respond exactly with:
-
-"I'm sorry, I couldn't find any scheme that matches your query."
-
-Be concise, factual, and format every response exactly as instructed.
-"""
-
-        _chat_session = model.start_chat(history=[])
-        _chat_history = []
-        _chat_session.send_message(system_prompt)
-
-    _chat_history.append({"role": "user", "content": prompt})
-
-    response = _chat_session.send_message(prompt)
-
-    _chat_history.append({"role": "assistant", "content": response.text})
-
-    return response.text
-
-def reset_chat():
-    global _chat_session, _chat_history
-    _chat_session = None
-    _chat_history = []
+def _extracted_from_query_gemini_7(prompt, profile, user_id, question):
+    response_text = client.generate(
+        prompt, system_instruction=PROFILES[profile], history=_history(profile, user_id)
+    )
+
+    _remember(profile, user_id, question or prompt, response_text)
+
+    return response_text
+
+def stream_gemini(prompt, profile="chat", user_id=None, question=None):
+    """Yields the response text chunk by chunk; the full answer is kept in the history."""
+    chunks = []
+    for chunk in client.stream(
+        prompt, system_instruction=PROFILES[profile], history=_history(profile, user_id)
+    ):
+        chunks.append(chunk)
+        yield chunk
+
+    _remember(profile, user_id, question or prompt, "".join(chunks))
+
+def _history(profile, user_id):
+    """The user's stored summary and recent turns in Gemini's chat history format."""
+    if user_id is None:
+        return []
+    session = get_session_store().get(profile, user_id)
+    history = []
+    if session["summary"]:
+        history.append(
+            {"role": "user", "parts": ["Summary of our conversation so far:\n" + session["summary"]]}
+        )
+        history.append({"role": "model", "parts": ["Noted."]})
+    # Turns still waiting to be summarized are sent verbatim.
+    for turn in session["pending"] + session["turns"]:
+        role = "model" if turn["role"] == "assistant" else "user"
+        history.append({"role": role, "parts": [turn["content"]]})
+    return history
+
+def _remember(profile, user_id, question, answer):
+    if user_id is not None:
+        get_session_store().append(profile, user_id, question, answer)
+
+def summarize_turns(summary, turns):
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", transcript=transcript)
+    return client.generate(prompt)
+
+def get_session_store():
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                redis_client = None
+                if CHAT_SESSION_BACKEND == "redis":
+                    from sevaksha_app.redis_client import get_redis
+
+                    redis_client = get_redis()
+                _session_store = ChatSessionStore(
+                    summarize=summarize_turns, redis_client=redis_client
+                )
+    return _session_store
+
+def reset_chat(profile="chat", user_id=None):
+    if user_id is not None:
+        get_session_store().reset(profile, user_id)
     return {"message": "Chat history cleared", "history": []}
 
-def get_chat_history():
-    global _chat_history
-    return _chat_history
+def get_chat_history(profile="chat", user_id=None):
+    if user_id is None:
+        return []
+    return get_session_store().get(profile, user_id)["turns"]
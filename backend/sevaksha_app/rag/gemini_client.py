@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, wait
+import google.generativeai as genai
+from google.api_core import exceptions as api_exceptions
+from .providers import LLMProvider
+
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 15))
+GEMINI_RETRIES = int(os.getenv("GEMINI_RETRIES", 2))
+GEMINI_BACKOFF = float(os.getenv("GEMINI_BACKOFF", 0.25))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+
+TRANSIENT_ERRORS = (
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.TooManyRequests,
+    ConnectionError,
+)
+
+
+class GeminiTimeout(TimeoutError):
+    pass
+
+
+class GeminiClient(LLMProvider):
+    """Shared access to one Gemini model with deadlines, retries and request coalescing.
+
+    ``GenerativeModel`` objects are created once per system instruction and
+    reused. Every call gets a deadline of ``timeout`` seconds that covers
+    queueing for one of ``max_concurrency`` slots, the upstream call and any
+    retries; transient errors are retried with jittered exponential backoff
+    while time remains. Identical requests that are in flight at the same
+    time share a single upstream call.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        model_name,
+        timeout=GEMINI_TIMEOUT,
+        retries=GEMINI_RETRIES,
+        backoff=GEMINI_BACKOFF,
+        max_concurrency=GEMINI_MAX_CONCURRENCY,
+    ):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+        self._stats = {
+            "calls": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+
+    def _reset(self):
+        # Also runs in forked children: gRPC channels and held locks must not be inherited.
+        self._models = {}
+        self._models_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def model(self, system_instruction=None):
+        model = self._models.get(system_instruction)
+        if model is None:
+            with self._models_lock:
+                model = self._models.get(system_instruction)
+                if model is None:
+                    model = genai.GenerativeModel(
+                        self.model_name, system_instruction=system_instruction
+                    )
+                    self._models[system_instruction] = model
+        return model
+
+    def _timeout(self):
+        self._count("timeouts")
+        return GeminiTimeout(f"Gemini call exceeded its {self.timeout}s deadline.")
+
+    def _remaining(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise self._timeout()
+        return remaining
+
+    def _send(self, system_instruction, history, prompt, deadline, stream=False):
+        """Sends one request, retrying transient errors.
+
+        A streamed response keeps its slot when returned; the caller must
+        release it once the stream is exhausted or abandoned.
+        """
+        attempt = 0
+        while True:
+            if not self._slots.acquire(timeout=self._remaining(deadline)):
+                raise self._timeout()
+            keep_slot = False
+            try:
+                self._count("calls")
+                chat = self.model(system_instruction).start_chat(history=history)
+                response = chat.send_message(
+                    prompt,
+                    stream=stream,
+                    request_options={"timeout": self._remaining(deadline)},
+                )
+                keep_slot = stream
+                return response
+            except TRANSIENT_ERRORS as e:
+                attempt += 1
+                delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+                if attempt > self.retries or time.monotonic() + delay >= deadline:
+                    self._count("errors")
+                    raise
+                self._count("retries")
+                print(f"Gemini call failed ({e}), retrying in {delay:.2f}s")
+            except Exception:
+                self._count("errors")
+                raise
+            finally:
+                if not keep_slot:
+                    self._slots.release()
+            time.sleep(delay)
+
+    def generate(self, prompt, system_instruction=None, history=(), timeout=None):
+        """Returns the response text, sharing the upstream call with identical concurrent requests."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        history = list(history)
+        key = hashlib.sha1(
+            json.dumps([system_instruction, history, prompt]).encode("utf-8")
+        ).hexdigest()
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._count("coalesced")
+            if not wait([future], timeout=self._remaining(deadline)).done:
+                raise self._timeout()
+            return future.result()
+
+        try:
+            text = self._send(system_instruction, history, prompt, deadline).text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, prompt, system_instruction=None, history=(), timeout=None):
+        """Yields response chunks; only the request itself is retried, never a partly read stream.
+
+        The concurrency slot is held until the stream is exhausted, fails
+        or the consumer closes the generator.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        response = self._send(system_instruction, list(history), prompt, deadline, stream=True)
+        try:
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats, inflight=len(self._inflight))
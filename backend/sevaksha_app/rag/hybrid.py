@@ -0,0 +1,184 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+import numpy as np
+
+TEXT_FIELDS = (
+    "scheme_name",
+    "target_occupation",
+    "eligibility_criteria",
+    "scheme_description",
+    "benefits",
+    "application_process",
+    "required_documents",
+)
+CATALOG_CHECK_SECONDS = 60
+KEYWORD_MAX_TOKENS = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUESTION_WORDS = {
+    "what", "which", "who", "whom", "how", "when", "where", "why",
+    "can", "could", "should", "would", "is", "are", "am", "do", "does",
+    "tell", "show", "list", "find", "give", "suggest", "explain",
+}
+_STOPWORDS = {"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def is_keyword_query(text):
+    """Short lookups like "farmer" or "PMAY" as opposed to natural-language questions."""
+    if "?" in text:
+        return False
+    words = _TOKEN_RE.findall(text.lower())
+    if not words or len(words) > KEYWORD_MAX_TOKENS:
+        return False
+    return not any(word in _QUESTION_WORDS for word in words)
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, one postings list per term."""
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        self.lengths = np.zeros(self.size, dtype=np.float32)
+        postings = defaultdict(list)
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths[position] = sum(counts.values())
+            for term, frequency in counts.items():
+                postings[term].append((position, frequency))
+        self.average_length = float(self.lengths.mean()) if self.size else 0.0
+        self.postings = {
+            term: (
+                np.array([p for p, _ in entries], dtype=np.int64),
+                np.array([f for _, f in entries], dtype=np.float32),
+            )
+            for term, entries in postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (self.size - len(positions) + 0.5) / (len(positions) + 0.5))
+            for term, (positions, _) in self.postings.items()
+        }
+
+    def scores(self, query):
+        scores = np.zeros(self.size, dtype=np.float32)
+        if not self.size:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / (self.average_length or 1.0))
+        for term in set(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            positions, frequencies = entry
+            scores[positions] += (
+                self.idf[term]
+                * frequencies
+                * (self.k1 + 1)
+                / (frequencies + norm[positions])
+            )
+        return scores
+
+
+def _normalize(scores):
+    top = scores.max() if scores.size else 0.0
+    return scores / top if top > 0 else scores
+
+
+class HybridSearcher:
+    """BM25 over the WelfareScheme text fields fused with the FAISS scheme document scores.
+
+    Only schemes that lexically match the query are returned, so keyword
+    lookups keep the "appears in any field" behaviour of the search prompt;
+    the vector scores decide how those matches are ordered.
+    """
+
+    def __init__(self, schemes, vector_store=None, alpha=0.5, fetch_k=20, version=None):
+        self.version = version
+        self.alpha = alpha
+        self.fetch_k = fetch_k
+        self.vector_store = vector_store
+        self.scheme_ids = np.array([s.scheme_id for s in schemes], dtype=np.int64)
+        self.positions = {s.scheme_id: position for position, s in enumerate(schemes)}
+        self.bm25 = BM25Index(
+            [
+                " ".join(str(getattr(s, field) or "") for field in TEXT_FIELDS)
+                for s in schemes
+            ]
+        )
+
+    def _vector_scores(self, query):
+        scores = np.zeros(len(self.scheme_ids), dtype=np.float32)
+        if self.vector_store is None:
+            return scores
+        for doc, distance in self.vector_store.similarity_search_with_score(
+            query, k=self.fetch_k
+        ):
+            position = self.positions.get(doc.metadata.get("scheme_id"))
+            if position is not None:
+                scores[position] = max(scores[position], 1.0 / (1.0 + float(distance)))
+        return scores
+
+    def search(self, query, limit=None):
+        """Returns the matching scheme ids, best first."""
+        lexical = self.bm25.scores(query)
+        matches = np.flatnonzero(lexical > 0)
+        if not matches.size:
+            return []
+        fused = self.alpha * _normalize(lexical) + (1 - self.alpha) * _normalize(
+            self._vector_scores(query)
+        )
+        ranked = matches[np.argsort(-fused[matches], kind="stable")]
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [int(self.scheme_ids[position]) for position in ranked]
+
+
+_searcher = None
+_searcher_checked_at = 0.0
+_searcher_lock = threading.Lock()
+
+
+def get_hybrid_searcher(vector_store=None, alpha=0.5):
+    """Process-wide searcher over the active catalog, rebuilt when the catalog changes.
+
+    ``vector_store`` may be None while the RAG engine is still loading; the
+    searcher then ranks by BM25 alone.
+    """
+    global _searcher, _searcher_checked_at
+    from sevaksha_app.eligibility import catalog_version
+    from sevaksha_app.models import WelfareScheme
+
+    now = time.monotonic()
+    if _searcher is not None and now - _searcher_checked_at < CATALOG_CHECK_SECONDS:
+        return _searcher
+    with _searcher_lock:
+        if _searcher is None or now - _searcher_checked_at >= CATALOG_CHECK_SECONDS:
+            version = catalog_version()
+            if _searcher is None or _searcher.version != version:
+                schemes = (
+                    WelfareScheme.query.filter(WelfareScheme.is_active.is_(True))
+                    .order_by(WelfareScheme.scheme_id)
+                    .all()
+                )
+                _searcher = HybridSearcher(
+                    schemes, vector_store=vector_store, alpha=alpha, version=version
+                )
+            _searcher_checked_at = now
+    if _searcher.vector_store is None:
+        # Built before the RAG engine finished warming up: BM25 only until now.
+        _searcher.vector_store = vector_store
+    return _searcher
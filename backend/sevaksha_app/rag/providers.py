@@ -0,0 +1,128 @@
+import os
+import random
+from abc import ABC, abstractmethod
+import re
+import threading
+import time
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+PROVIDERS = ("gemini", "fake")
+FAKE_LLM_MODE = os.getenv("FAKE_LLM_MODE", "retrieval")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 800))
+FAKE_LLM_LATENCY_SIGMA = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", 0.4))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", 0))
+
+NO_MATCH_ANSWER = "I'm sorry, I couldn't find any scheme that matches your query."
+_SCHEME_NAME_RE = re.compile(r"^Scheme Name: (.+)$", re.MULTILINE)
+
+
+class LLMProvider(ABC):
+    """What the RAG layer needs from a language model.
+
+    Subclasses implement ``generate``; ``stream`` defaults to yielding the
+    whole answer at once.
+    """
+
+    name = None
+
+    @abstractmethod
+    def generate(self, prompt, system_instruction=None, history=(), timeout=None):
+        """Returns the response text for ``prompt``."""
+
+    def stream(self, prompt, system_instruction=None, history=(), timeout=None):
+        yield self.generate(prompt, system_instruction, history, timeout)
+
+    def stats(self):
+        return {}
+
+
+class FakeProvider(LLMProvider):
+    """Offline stand-in for Gemini for load tests.
+
+    Answers in the "- Scheme Name" format the routes parse. In ``retrieval``
+    mode they list the schemes in the prompt's retrieved context; in
+    ``canned`` mode every answer is the same list of the first ``canned``
+    catalog schemes. Latency is log-normal around ``latency_ms`` with shape
+    ``sigma`` from a seeded generator, so runs are repeatable.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        mode=FAKE_LLM_MODE,
+        latency_ms=FAKE_LLM_LATENCY_MS,
+        sigma=FAKE_LLM_LATENCY_SIGMA,
+        seed=FAKE_LLM_SEED,
+        canned=3,
+        max_schemes=5,
+    ):
+        if mode not in ("retrieval", "canned"):
+            raise ValueError(f"Unknown fake LLM mode '{mode}', expected 'retrieval' or 'canned'.")
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.max_schemes = max_schemes
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._canned = None
+        if mode == "canned":
+            from .data_loader import load_schemes
+
+            self._canned = self._format(
+                scheme["scheme_name"] for scheme in load_schemes()[:canned]
+            )
+        self._stats = {"calls": 0, "latency_ms": 0.0}
+
+    def _latency(self):
+        with self._lock:
+            latency = self.latency_ms * self._random.lognormvariate(0, self.sigma)
+        return latency / 1000.0
+
+    def _format(self, names):
+        names = list(dict.fromkeys(names))[: self.max_schemes]
+        if not names:
+            return NO_MATCH_ANSWER
+        return "\n".join(f"- {name.strip()}" for name in names)
+
+    def _answer(self, prompt):
+        if self._canned is not None:
+            return self._canned
+        return self._format(_SCHEME_NAME_RE.findall(prompt))
+
+    def generate(self, prompt, system_instruction=None, history=(), timeout=None):
+        latency = self._latency()
+        self._stats["calls"] += 1
+        self._stats["latency_ms"] += latency * 1000.0
+        time.sleep(latency)
+        return self._answer(prompt)
+
+    def stream(self, prompt, system_instruction=None, history=(), timeout=None):
+        """Spends a third of the latency before the first line and spreads the rest over the others."""
+        latency = self._latency()
+        self._stats["calls"] += 1
+        self._stats["latency_ms"] += latency * 1000.0
+        lines = self._answer(prompt).splitlines(keepends=True)
+        time.sleep(latency / 3)
+        for position, line in enumerate(lines):
+            if position:
+                time.sleep(latency * 2 / 3 / (len(lines) - 1))
+            yield line
+
+    def stats(self):
+        calls = self._stats["calls"]
+        return {
+            "calls": calls,
+            "mean_latency_ms": self._stats["latency_ms"] / calls if calls else 0.0,
+        }
+
+
+def create_provider(name=LLM_PROVIDER, model_name=None):
+    """Returns the LLM provider selected by LLM_PROVIDER."""
+    if name == "gemini":
+        from .gemini_client import GeminiClient
+
+        return GeminiClient(model_name)
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown LLM provider '{name}', expected one of {PROVIDERS}.")
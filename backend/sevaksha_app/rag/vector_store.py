@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import faiss
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from .ann import apply_search_params
+from .data_loader import DATA_DIR, SCHEMES_JSON_PATH, MAX_DOCUMENT_CHARS
+
+FORMAT_VERSION = 2
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+VECTOR_STORE_DIR = os.getenv(
+    "VECTOR_STORE_DIR", os.path.join(DATA_DIR, "vector_store")
+)
+METADATA_FILE = "metadata.json"
+
+
+class StaleIndexError(RuntimeError):
+    """Raised when the persisted index is missing or does not match the source data."""
+
+
+def source_hash(file_path=SCHEMES_JSON_PATH):
+    """Returns the SHA-256 of the source data the index is built from."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _index_version(documents, index_params):
+    digest = hashlib.sha256(
+        f"{FORMAT_VERSION}:{EMBEDDING_MODEL}:{MAX_DOCUMENT_CHARS}:".encode()
+    )
+    digest.update(json.dumps(index_params, sort_keys=True).encode())
+    for doc in documents:
+        digest.update(doc["id"].encode())
+    return digest.hexdigest()[:12]
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _prune(directory, prefix, suffix, keep):
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix) and name != keep:
+            os.remove(os.path.join(directory, name))
+
+
+def save_vector_store(
+    index,
+    index_params,
+    documents,
+    vectors,
+    source_sha256,
+    build=None,
+    directory=VECTOR_STORE_DIR,
+):
+    """Writes the FAISS index, its embeddings and metadata as a versioned artifact.
+
+    ``documents`` are ``{"id", "page_content", "metadata"}`` dicts aligned
+    with the index positions and the rows of ``vectors``; ``index_params``
+    records the index type and the training/search parameters. The index and
+    embedding files carry the version in their name and the metadata file
+    is swapped in last, so a reader never sees a metadata/index mismatch and
+    workers that already loaded the previous index keep working.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = _index_version(documents, index_params)
+    index_file = f"index-{version}.faiss"
+    embeddings_file = f"embeddings-{version}.npy"
+
+    tmp_index_path = os.path.join(directory, index_file + ".tmp")
+    faiss.write_index(index, tmp_index_path)
+    os.replace(tmp_index_path, os.path.join(directory, index_file))
+
+    tmp_embeddings_path = os.path.join(directory, embeddings_file + ".tmp")
+    with open(tmp_embeddings_path, "wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp_embeddings_path, os.path.join(directory, embeddings_file))
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "index_file": index_file,
+        "embeddings_file": embeddings_file,
+        "source_sha256": source_sha256,
+        "embedding_model": EMBEDDING_MODEL,
+        "max_document_chars": MAX_DOCUMENT_CHARS,
+        "index": index_params,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "build": build or {},
+        "documents": documents,
+    }
+    tmp_metadata_path = os.path.join(directory, METADATA_FILE + ".tmp")
+    with open(tmp_metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    os.replace(tmp_metadata_path, os.path.join(directory, METADATA_FILE))
+
+    _prune(directory, "index-", ".faiss", index_file)
+    _prune(directory, "embeddings-", ".npy", embeddings_file)
+    return metadata
+
+
+def load_embeddings(metadata, directory=VECTOR_STORE_DIR):
+    """Previously computed document embeddings keyed by document content hash."""
+    path = os.path.join(directory, metadata.get("embeddings_file") or "")
+    if not metadata.get("embeddings_file") or not os.path.exists(path):
+        return {}
+    vectors = np.load(path, mmap_mode="r")
+    if len(vectors) != len(metadata["documents"]):
+        return {}
+    return {
+        doc["id"]: np.asarray(vectors[position])
+        for position, doc in enumerate(metadata["documents"])
+    }
+
+
+def load_document_vectors(metadata, directory=VECTOR_STORE_DIR):
+    """Memory-mapped document embeddings in index order."""
+    path = os.path.join(directory, metadata.get("embeddings_file") or "")
+    if not metadata.get("embeddings_file") or not os.path.exists(path):
+        raise StaleIndexError(
+            f"Vector store {metadata.get('version')} has no embeddings file. "
+            "Run `python -m sevaksha_app.rag.build_vector_store` first."
+        )
+    vectors = np.load(path, mmap_mode="r")
+    if len(vectors) != len(metadata["documents"]):
+        raise StaleIndexError(
+            f"Vector store {metadata['version']} is corrupt: "
+            f"{len(vectors)} embeddings for {len(metadata['documents'])} documents."
+        )
+    return vectors
+
+
+def read_metadata(directory=VECTOR_STORE_DIR):
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        raise StaleIndexError(
+            f"No vector store found in {directory}. "
+            "Run `python -m sevaksha_app.rag.build_vector_store` first."
+        )
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_metadata(metadata):
+    if metadata.get("format_version") != FORMAT_VERSION:
+        raise StaleIndexError(
+            f"Vector store format {metadata.get('format_version')} is not supported, expected {FORMAT_VERSION}."
+        )
+    if metadata.get("embedding_model") != EMBEDDING_MODEL:
+        raise StaleIndexError(
+            f"Vector store was built with {metadata.get('embedding_model')}, expected {EMBEDDING_MODEL}."
+        )
+    if metadata.get("source_sha256") != source_hash():
+        raise StaleIndexError(
+            f"Vector store {metadata.get('version')} is stale: schemes data has changed since it was built."
+        )
+
+
+def load_index(directory=VECTOR_STORE_DIR):
+    """Reads and validates a previously built index and its metadata.
+
+    Needs no embedding model, so a missing, stale or corrupt index is
+    reported (StaleIndexError) before one is loaded. FAISS's IO_FLAG_MMAP only maps the inverted lists of IVF indexes
+    (VECTOR_INDEX_TYPE=ivf or pq), which forked workers then share; flat
+    and HNSW indexes are still read into each process. The document
+    embeddings (load_document_vectors) are memory-mapped for every type.
+    """
+    metadata = read_metadata(directory)
+    check_metadata(metadata)
+
+    index = faiss.read_index(
+        os.path.join(directory, metadata["index_file"]),
+        faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+    )
+    index_params = metadata.get("index", {"type": "flat"})
+    apply_search_params(index, index_params["type"], index_params)
+    documents = metadata["documents"]
+    if index.ntotal != len(documents):
+        raise StaleIndexError(
+            f"Vector store {metadata['version']} is corrupt: "
+            f"{index.ntotal} vectors for {len(documents)} documents."
+        )
+    return index, metadata
+
+
+def vector_store_from_index(embeddings, index, metadata):
+    documents = metadata["documents"]
+    docstore = InMemoryDocstore(
+        {
+            doc["id"]: Document(
+                page_content=doc["page_content"], metadata=doc["metadata"]
+            )
+            for doc in documents
+        }
+    )
+    index_to_docstore_id = {
+        position: doc["id"] for position, doc in enumerate(documents)
+    }
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def load_vector_store(embeddings, directory=VECTOR_STORE_DIR):
+    """Loads a previously built index and its documents."""
+    index, metadata = load_index(directory)
+    return vector_store_from_index(embeddings, index, metadata), metadata
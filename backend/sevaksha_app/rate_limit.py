@@ -0,0 +1,217 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from sevaksha_app.redis_client import get_redis
+
+KEY_PREFIX = "sevaksha:ratelimit:"
+SCOPES = ("ip", "user", "identifier")
+IDENTIFIER_FIELDS = ("identifier", "email", "mobile")
+
+# Sliding-window counters: each rule keeps a counter for the current and the
+# previous fixed window, and the previous one is weighted by how much of it
+# still overlaps the sliding window. All rules of a request are checked
+# first and only counted when every one of them admits it.
+SLIDING_WINDOW_SCRIPT = """
+local blocked = 0
+local counts = {}
+for i = 1, #ARGV / 3 do
+    local limit = tonumber(ARGV[3 * i - 2])
+    local window = tonumber(ARGV[3 * i - 1])
+    local elapsed = tonumber(ARGV[3 * i])
+    local current = tonumber(redis.call("GET", KEYS[2 * i - 1]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[2 * i]) or "0")
+    counts[2 * i - 1] = current
+    counts[2 * i] = previous
+    if previous * (window - elapsed) / window + current + 1 > limit then
+        blocked = 1
+    end
+end
+if blocked == 0 then
+    for i = 1, #ARGV / 3 do
+        redis.call("INCR", KEYS[2 * i - 1])
+        redis.call("PEXPIRE", KEYS[2 * i - 1], 2 * tonumber(ARGV[3 * i - 1]))
+    end
+end
+return {blocked, unpack(counts)}
+"""
+
+
+class Rule:
+    """``limit`` requests per ``window`` seconds for each distinct ``scope`` value."""
+
+    def __init__(self, scope, limit, window):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown rate limit scope '{scope}', expected one of {SCOPES}.")
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    @classmethod
+    def parse_all(cls, spec):
+        """Rules from a spec like "ip:20/60,identifier:5/300" (scope:limit/seconds)."""
+        rules = []
+        for part in (spec or "").split(","):
+            if part.strip():
+                scope, _, rate = part.strip().partition(":")
+                limit, _, window = rate.partition("/")
+                rules.append(cls(scope.strip(), int(limit), int(window)))
+        return rules
+
+    def retry_after(self, elapsed, current, previous):
+        """Seconds until one more request fits, given the counters that rejected it."""
+        window = self.window
+        if current + 1 > self.limit:
+            # Only the next window can admit it, once the now-previous count has decayed enough.
+            wait = window - elapsed
+            if current:
+                wait += max(0.0, window * (1 - (self.limit - 1) / current))
+        else:
+            wait = window * (1 - (self.limit - current - 1) / previous) - elapsed
+        return max(1, math.ceil(wait))
+
+
+def _client_ip():
+    # Behind a proxy this relies on the ProxyFix set up from TRUSTED_PROXIES.
+    return request.remote_addr or "unknown"
+
+
+def _identifier():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    for field in IDENTIFIER_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str) and value.strip():
+            return value.strip().lower()
+    return None
+
+
+def _scope_value(scope):
+    if scope == "ip":
+        return _client_ip()
+    if scope == "user":
+        principal = g.get("principal")
+        return str(principal.userid) if principal is not None else None
+    value = _identifier()
+    # Keep emails and phone numbers out of Redis key names.
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32] if value else None
+
+
+class RateLimiter:
+    """Applies sliding-window rules in Redis with one script call per request.
+
+    Redis errors fail open: a request is let through and counted rather
+    than refused because the limiter is unavailable.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, name, field):
+        with self._lock:
+            counters = self._stats.setdefault(
+                name, {"allowed": 0, "rejected": 0, "redis_errors": 0}
+            )
+            counters[field] += 1
+
+    def check(self, name, rules):
+        """Counts one request against ``rules``; returns None or the seconds to wait."""
+        now = time.time()
+        keys, args, applied = [], [], []
+        for rule in rules:
+            value = _scope_value(rule.scope)
+            if value is None:
+                continue
+            index, elapsed = divmod(now, rule.window)
+            key = f"{KEY_PREFIX}{name}:{rule.scope}:{value}:"
+            keys += [f"{key}{int(index)}", f"{key}{int(index) - 1}"]
+            args += [rule.limit, rule.window * 1000, int(elapsed * 1000)]
+            applied.append((rule, elapsed))
+        if not applied:
+            return None
+
+        try:
+            blocked, *counts = self.script(keys=keys, args=args)
+        except Exception as e:
+            self._count(name, "redis_errors")
+            print(f"Rate limiter unavailable for {name}: {e}")
+            return None
+        if not blocked:
+            self._count(name, "allowed")
+            return None
+
+        self._count(name, "rejected")
+        waits = []
+        for position, (rule, elapsed) in enumerate(applied):
+            current, previous = int(counts[2 * position]), int(counts[2 * position + 1])
+            if previous * (rule.window - elapsed) / rule.window + current + 1 > rule.limit:
+                waits.append(rule.retry_after(elapsed, current, previous))
+                print(f"Rate limited {name} by {rule.scope} ({rule.limit}/{rule.window}s)")
+        return max(waits, default=1)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._stats.items()}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def _reset():
+    global _limiter, _limiter_lock
+    _limiter = None
+    _limiter_lock = threading.Lock()
+
+
+# Its Redis client belongs to the parent; forked workers connect their own.
+os.register_at_fork(after_in_child=_reset)
+
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(get_redis())
+    return _limiter
+
+
+def rate_limit(policies):
+    """Blueprint decorator limiting the views named in ``policies``.
+
+    ``policies`` maps a view function name to the config key holding its
+    rules; views not listed are left alone. For per-user rules the
+    decorator has to come after login_required.
+    """
+
+    def decorator(fn):
+        config_key = policies.get(fn.__name__)
+        if config_key is None:
+            return fn
+        # Views sharing a config key (e.g. both chat routes) share its counters.
+        name = config_key.removeprefix("RATE_LIMIT_").lower()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            rules = Rule.parse_all(config[config_key])
+            if config["RATE_LIMIT_ENABLED"] and rules:
+                retry_after = get_rate_limiter().check(name, rules)
+                if retry_after is not None:
+                    response = jsonify(
+                        {"error": "Too many requests. Please try again later."}
+                    )
+                    return response, 429, {"Retry-After": str(retry_after)}
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
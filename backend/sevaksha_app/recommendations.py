@@ -0,0 +1,220 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from sevaksha_app import db
+from sevaksha_app.eligibility import EligibilityEngine, profile_from_user
+
+USER_BATCH_SIZE = 500
+
+
+def profile_hash(profile):
+    # Rows carry Decimal incomes and cached principals floats; hash both the same way.
+    if profile.get("income") is not None:
+        profile = dict(profile, income=float(profile["income"]))
+    return hashlib.sha256(
+        json.dumps(profile, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _write(engine, users, refreshed_at):
+    """Replaces the materialized recommendations and refresh state of ``users``."""
+    from sevaksha_app.models import RecommendationState, UserRecommendation
+
+    user_ids = [user.userid for user in users]
+    profiles = [profile_from_user(user) for user in users]
+    UserRecommendation.query.filter(UserRecommendation.user_id.in_(user_ids)).delete(
+        synchronize_session=False
+    )
+    RecommendationState.query.filter(RecommendationState.user_id.in_(user_ids)).delete(
+        synchronize_session=False
+    )
+
+    rows, states = [], []
+    for user_id, profile, ranked in zip(user_ids, profiles, engine.recommend(profiles)):
+        for rank, match in enumerate(ranked):
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "scheme_id": match["scheme_id"],
+                    "rank": rank,
+                    "eligible": match["eligible"],
+                    "score": match["score"],
+                    "matched": ",".join(match["matched"]),
+                    "unmatched": ",".join(match["unmatched"]),
+                    "unknown": ",".join(match["unknown"]),
+                }
+            )
+        states.append(
+            {
+                "user_id": user_id,
+                "profile_hash": profile_hash(profile),
+                "catalog_version": engine.version,
+                "refreshed_at": refreshed_at,
+            }
+        )
+    if rows:
+        db.session.bulk_insert_mappings(UserRecommendation, rows)
+    db.session.bulk_insert_mappings(RecommendationState, states)
+    return len(rows)
+
+
+def refresh_users(user_ids, engine=None):
+    """Recomputes the recommendations of the given users.
+
+    Each batch locks its user rows (in id order, so concurrent refreshes
+    cannot deadlock) until it commits, which serializes the inline refresh
+    in /recommendation with the Celery task for the same user.
+    """
+    from sevaksha_app.models import User
+
+    engine = engine or EligibilityEngine.from_catalog()
+    refreshed_at = _now()
+    rows = 0
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), USER_BATCH_SIZE):
+        users = (
+            User.query.filter(User.userid.in_(user_ids[start : start + USER_BATCH_SIZE]))
+            .order_by(User.userid)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        rows += _write(engine, users, refreshed_at)
+        db.session.commit()
+    return rows
+
+
+def queue_refresh(user_ids):
+    """Queues a background refresh of ``user_ids``.
+
+    A failure to queue is only logged: /recommendation still notices the
+    changed profile and refreshes inline.
+    """
+    from sevaksha_app.tasks import refresh_user_recommendations
+
+    try:
+        refresh_user_recommendations.delay(list(user_ids))
+    except Exception as e:
+        print(f"Couldn't queue a recommendation refresh for users {list(user_ids)}: {e}")
+
+
+def _affected_by_catalog(users, since):
+    """Users whose list can differ after the schemes changed since ``since`` are re-ranked.
+
+    Only the changed schemes are evaluated for everyone: a user is affected
+    when one of them is now eligible for them or is already in their list.
+    Schemes that were deactivated or deleted affect the users listing them.
+    """
+    from sevaksha_app.models import UserRecommendation, WelfareScheme
+
+    changed = WelfareScheme.query.filter(WelfareScheme.updated_at > since).all()
+    changed_ids = {scheme.scheme_id for scheme in changed}
+    active_ids = {
+        scheme_id
+        for (scheme_id,) in WelfareScheme.query.with_entities(
+            WelfareScheme.scheme_id
+        ).filter(WelfareScheme.is_active.is_(True))
+    }
+    user_ids = {user.userid for user in users}
+    listed = db.session.query(UserRecommendation.user_id).filter(
+        UserRecommendation.scheme_id.in_(changed_ids)
+        | UserRecommendation.scheme_id.notin_(active_ids)
+    )
+    affected = {user_id for (user_id,) in listed.distinct() if user_id in user_ids}
+
+    candidates = EligibilityEngine(
+        [scheme for scheme in changed if scheme.is_active], version="changed"
+    )
+    pending = [user for user in users if user.userid not in affected]
+    if len(candidates) and pending:
+        ranked = candidates.recommend([profile_from_user(user) for user in pending])
+        affected.update(user.userid for user, matches in zip(pending, ranked) if matches)
+    return affected
+
+
+def refresh_stale():
+    """Fallback sweep for whatever the event-driven refreshes missed.
+
+    Registration and profile edits queue their own refreshes, so this only
+    picks up users without materialized recommendations and, after the
+    scheme catalog changed, users still on an older catalog version. Both
+    are found in SQL; when nothing is stale no user is loaded. Of the users
+    behind on the catalog only those the changed schemes can affect are
+    recomputed; the rest just move to the new version.
+    """
+    from sevaksha_app.models import RecommendationState, User
+
+    engine = EligibilityEngine.from_catalog()
+    missing = [
+        user_id
+        for (user_id,) in db.session.query(User.userid)
+        .outerjoin(RecommendationState, RecommendationState.user_id == User.userid)
+        .filter(RecommendationState.user_id.is_(None))
+    ]
+    old_catalog = RecommendationState.query.filter(
+        RecommendationState.catalog_version != engine.version
+    ).all()
+
+    report = {
+        "catalog_version": engine.version,
+        "missing": len(missing),
+        "stale_catalog": len(old_catalog),
+        "max_staleness_seconds": max(
+            [(_now() - state.refreshed_at).total_seconds() for state in old_catalog],
+            default=0.0,
+        ),
+        "refreshed_users": 0,
+        "rows": 0,
+    }
+
+    affected = set(missing)
+    if old_catalog:
+        since = min(state.refreshed_at for state in old_catalog)
+        behind = [state.user_id for state in old_catalog]
+        users = []
+        for start in range(0, len(behind), USER_BATCH_SIZE):
+            users += User.query.filter(
+                User.userid.in_(behind[start : start + USER_BATCH_SIZE])
+            ).all()
+        affected |= _affected_by_catalog(users, since)
+        untouched = [user_id for user_id in behind if user_id not in affected]
+        for start in range(0, len(untouched), USER_BATCH_SIZE):
+            RecommendationState.query.filter(
+                RecommendationState.user_id.in_(untouched[start : start + USER_BATCH_SIZE])
+            ).update(
+                {"catalog_version": engine.version, "refreshed_at": _now()},
+                synchronize_session=False,
+            )
+        db.session.commit()
+
+    if affected:
+        report["rows"] = refresh_users(affected, engine)
+    report["refreshed_users"] = len(affected)
+    return report
+
+
+def recommendations_for(user, version=None):
+    """The materialized recommendations of ``user``, their refresh state and why they are stale.
+
+    Staleness is None when up to date, "profile" when the user's profile
+    changed (or was never materialized) and "catalog" when the scheme
+    catalog moved past ``version``.
+    """
+    from sevaksha_app.models import RecommendationState, UserRecommendation
+
+    state = db.session.get(RecommendationState, user.userid)
+    staleness = None
+    if state is None or state.profile_hash != profile_hash(profile_from_user(user)):
+        staleness = "profile"
+    elif version is not None and state.catalog_version != version:
+        staleness = "catalog"
+    rows = (
+        UserRecommendation.query.filter_by(user_id=user.userid)
+        .order_by(UserRecommendation.rank)
+        .all()
+    )
+    return rows, state, staleness
@@ -0,0 +1,37 @@
+import os
+import redis
+from flask import current_app
+
+_client = None
+
+
+def _reset():
+    global _client
+    _client = None
+
+
+# A connection opened by the parent must not be shared with forked workers.
+os.register_at_fork(after_in_child=_reset)
+
+
+def connect_redis(config, **options):
+    """A new Redis client on the host/port flask_caching is configured with."""
+    options = {
+        "socket_timeout": 0.5,
+        "socket_connect_timeout": 0.5,
+        "decode_responses": True,
+        **options,
+    }
+    return redis.Redis(
+        host=config.get("CACHE_REDIS_HOST") or "localhost",
+        port=int(config.get("CACHE_REDIS_PORT") or 6379),
+        **options,
+    )
+
+
+def get_redis():
+    """Process-wide Redis client on the host/port flask_caching is configured with."""
+    global _client
+    if _client is None:
+        _client = connect_redis(current_app.config)
+    return _client
@@ -0,0 +1,239 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sevaksha_app import ist
+from sevaksha_app.redis_client import connect_redis, get_redis
+
+CHANNEL = "sevaksha:revocations"
+KEY_PREFIX = "sevaksha:revoked:"
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex digests, sized for ``capacity`` items at ``error_rate``."""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, digest):
+        first, second = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, digest):
+        positions = self._positions(digest)
+        # Request threads and the sync thread add concurrently; a lost bit would let a revoked token through.
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, digest):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+
+class RevocationList:
+    """Revoked tokens in Redis, fronted by a per-process Bloom filter.
+
+    Revoking a token stores its digest in Redis until the token would have
+    expired anyway and publishes it, so every process adds it to its Bloom
+    filter. A token the filter has never seen is accepted without any
+    network round trip; only filter hits (real revocations and rare false
+    positives) are confirmed in Redis. The blacklistedtoken table stays the
+    durable record: it seeds the filter and is consulted whenever Redis
+    cannot confirm a hit, and for every token while the filter is not in
+    sync (before the first rebuild and after the subscription drops). The
+    filter is rebuilt every ``rebuild_seconds`` to shed expired tokens, and
+    whenever the subscription reconnects. Revocations that could not be
+    written to Redis are retried by the sync thread.
+    """
+
+    def __init__(self, app, redis_client, subscriber, capacity, error_rate, rebuild_seconds):
+        self.app = app
+        self.redis = redis_client
+        self.subscriber = subscriber
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.synced = False
+        self.rebuilt_at = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._bloom_lock = threading.Lock()
+        self._rebuilding = None
+        self._unpublished = []
+        self._stats = {
+            "bloom_negatives": 0,
+            "redis_checks": 0,
+            "database_checks": 0,
+            "false_positives": 0,
+            "redis_errors": 0,
+        }
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._listen, name="revocation-sync", daemon=True
+                    )
+                    self._thread.start()
+
+    def _rebuild(self):
+        from sevaksha_app.models import BlacklistedToken
+
+        with self._bloom_lock:
+            self._rebuilding = []
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for key in self.redis.scan_iter(match=KEY_PREFIX + "*", count=1000):
+            bloom.add(key[len(KEY_PREFIX) :])
+        with self.app.app_context():
+            for (token,) in BlacklistedToken.query.with_entities(
+                BlacklistedToken.token
+            ).filter(BlacklistedToken.expiry > datetime.now(ist)):
+                bloom.add(token_digest(token))
+        with self._bloom_lock:
+            # Tokens revoked here while the new filter was being filled.
+            for digest in self._rebuilding:
+                bloom.add(digest)
+            self._rebuilding = None
+            self.bloom = bloom
+        self.synced = True
+        self.rebuilt_at = time.monotonic()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                pubsub = self.subscriber.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Subscribe first so nothing published during the rebuild is missed.
+                self._rebuild()
+                backoff = 1
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.bloom.add(message["data"])
+                    self._publish_pending()
+                    if time.monotonic() - self.rebuilt_at >= self.rebuild_seconds:
+                        self._rebuild()
+            except Exception as e:
+                self.synced = False
+                print(f"Revocation sync failed, retrying in {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _publish(self, digest, expires_at):
+        ttl = int(expires_at - time.time())
+        if ttl > 0:
+            self.redis.set(KEY_PREFIX + digest, 1, ex=ttl)
+            self.redis.publish(CHANNEL, digest)
+
+    def _publish_pending(self):
+        with self._bloom_lock:
+            pending, self._unpublished = self._unpublished, []
+        for position, (digest, expires_at) in enumerate(pending):
+            try:
+                self._publish(digest, expires_at)
+            except Exception:
+                with self._bloom_lock:
+                    self._unpublished.extend(pending[position:])
+                raise
+
+    def revoke(self, token, expires_at):
+        """Revokes ``token`` until ``expires_at`` (a Unix timestamp).
+
+        The caller must have stored the BlacklistedToken row first: if Redis
+        cannot be written the sync thread retries, and until then other
+        processes only find the token in the database.
+        """
+        digest = token_digest(token)
+        with self._bloom_lock:
+            self.bloom.add(digest)
+            if self._rebuilding is not None:
+                self._rebuilding.append(digest)
+        try:
+            self._publish(digest, expires_at)
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            with self._bloom_lock:
+                self._unpublished.append((digest, expires_at))
+            print(f"Couldn't publish token revocation, will retry: {e}")
+
+    def is_revoked(self, token):
+        self.start()
+        digest = token_digest(token)
+        if self.synced and digest not in self.bloom:
+            self._stats["bloom_negatives"] += 1
+            return False
+
+        synced = self.synced
+        try:
+            self._stats["redis_checks"] += 1
+            if self.redis.exists(KEY_PREFIX + digest):
+                return True
+        except Exception:
+            self._stats["redis_errors"] += 1
+
+        # Redis misses tokens whose revocation never reached it; the table has them all.
+        from sevaksha_app.models import BlacklistedToken
+
+        self._stats["database_checks"] += 1
+        revoked = BlacklistedToken.query.filter_by(token=token).first() is not None
+        if synced and not revoked:
+            self._stats["false_positives"] += 1
+        return revoked
+
+    def stats(self):
+        return dict(
+            self._stats,
+            synced=self.synced,
+            unpublished=len(self._unpublished),
+            bloom_entries=self.bloom.count,
+            bloom_bits=self.bloom.size,
+        )
+
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+
+def _reset():
+    global _revocations, _revocations_lock
+    _revocations = None
+    _revocations_lock = threading.Lock()
+
+
+# The sync thread and its subscription do not survive a fork; each worker starts its own.
+os.register_at_fork(after_in_child=_reset)
+
+
+def get_revocation_list():
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                config = current_app.config
+                _revocations = RevocationList(
+                    current_app._get_current_object(),
+                    get_redis(),
+                    connect_redis(config, socket_timeout=None, health_check_interval=30),
+                    capacity=config["REVOCATION_BLOOM_CAPACITY"],
+                    error_rate=config["REVOCATION_BLOOM_ERROR_RATE"],
+                    rebuild_seconds=config["REVOCATION_BLOOM_REBUILD_SECONDS"],
+                )
+    return _revocations
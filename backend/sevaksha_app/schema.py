@@ -0,0 +1,104 @@
+import json
+import os
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+from sevaksha_app import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+# The first migration: the schema db.create_all() used to build.
+BASELINE_REVISION = "5b1e0c7d2a94"
+# Any constant works, as long as nothing else takes this advisory lock.
+SCHEMA_LOCK_KEY = 20261018
+GENDERS = ("Male", "Female", "Neutral")
+MARITAL_STATUSES = (
+    "Never Married",
+    "Currently Married",
+    "Widowed",
+    "Divorced",
+    "Separated",
+)
+
+
+def upgrade_schema():
+    """Runs pending migrations; databases built by db.create_all() are adopted at the baseline."""
+    tables = inspect(db.engine).get_table_names()
+    if "user" in tables and "alembic_version" not in tables:
+        print("Adopting a database created without migrations.")
+        db.create_all()
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
+
+def scheme_criteria(scheme_data):
+    """The gender and marital_stat columns for a schemes.json entry.
+
+    schemes.json says "Neutral" when a scheme is open to every marital
+    status; the column has no such value, so that is stored as NULL.
+    """
+    gender = scheme_data.get("gender")
+    marital_status = scheme_data.get("marital_status")
+    return {
+        "gender": gender if gender in GENDERS else None,
+        "marital_stat": marital_status if marital_status in MARITAL_STATUSES else None,
+    }
+
+
+def seed_schemes(json_path):
+    """Adds the schemes in ``json_path`` that the catalog does not have yet."""
+    from sevaksha_app.models import WelfareScheme
+    from sevaksha_app.rag.data_loader import scheme_key
+
+    if not os.path.exists(json_path):
+        return 0
+    with open(json_path, "r", encoding="utf-8") as f:
+        schemes = json.load(f)
+
+    existing = {
+        scheme_key(name)
+        for (name,) in WelfareScheme.query.with_entities(WelfareScheme.scheme_name)
+    }
+    added = 0
+    for scheme_data in schemes:
+        key = scheme_key(scheme_data["scheme_name"])
+        if key in existing:
+            continue
+        existing.add(key)
+        db.session.add(
+            WelfareScheme(
+                scheme_name=scheme_data.get("scheme_name"),
+                min_age=scheme_data.get("min_age"),
+                max_age=scheme_data.get("max_age"),
+                income_limit=scheme_data.get("income_limit"),
+                target_occupation=scheme_data.get("target_occupation"),
+                eligibility_criteria=scheme_data.get("eligibility_criteria"),
+                required_documents=scheme_data.get("required_documents"),
+                scheme_description=scheme_data.get("scheme_description"),
+                application_process=scheme_data.get("application_process"),
+                benefits=scheme_data.get("benefits"),
+                application_link=scheme_data.get("application_link"),
+                language_support=scheme_data.get("language_support"),
+                is_active=scheme_data.get("is_active", True),
+                **scheme_criteria(scheme_data),
+            )
+        )
+        added += 1
+    db.session.commit()
+    return added
+
+
+def prepare_database(app):
+    """Migrates (if SCHEMA_AUTO_UPGRADE) and seeds the database.
+
+    The web workers, Celery workers and beat all call create_app, so the
+    work is serialized with a Postgres advisory lock.
+    """
+    with db.engine.connect() as lock:
+        lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        lock.commit()
+        try:
+            if app.config["SCHEMA_AUTO_UPGRADE"]:
+                upgrade_schema()
+            seed_schemes(os.path.join(app.root_path, "static", "data", "schemes.json"))
+        finally:
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            lock.commit()
@@ -1,4 +1,5 @@
 import os
+import time
 from datetime import datetime, timedelta
 from celery import shared_task
 from flask import current_app, render_template
@@ -16,20 +17,87 @@ def monthly_report():
     return "OK"
 
 
-@shared_task(ignore_result=True)
+@shared_task
 def delete_blacklisted_tokens():
+    """Deletes expired tokens in short batches until none are left or the time budget is spent.
+
+    Each batch is its own transaction and skips rows another transaction
+    holds, so logins and logouts never wait on the cleanup; whatever is
+    left over is picked up by the next run.
+    """
+    from sqlalchemy import delete, select
     from sevaksha_app import db, ist
     from sevaksha_app.models import BlacklistedToken
 
+    batch_size = current_app.config["TOKEN_CLEANUP_BATCH_SIZE"]
+    deadline = time.monotonic() + current_app.config["TOKEN_CLEANUP_TIME_BUDGET"]
+    now = datetime.now(ist)
+    deleted, batches = 0, 0
     try:
-        expired_tokens = BlacklistedToken.query.filter(
-            BlacklistedToken.expiry <= datetime.now(ist)
-        ).all()
-        for blacklisted_token in expired_tokens:
-            db.session.delete(blacklisted_token)
-        db.session.commit()
-        print(f"Deleted {len(expired_tokens)} blacklisted tokens.")
+        while True:
+            expired = (
+                select(BlacklistedToken.blacklistedid)
+                .where(BlacklistedToken.expiry <= now)
+                .order_by(BlacklistedToken.expiry)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = db.session.execute(
+                delete(BlacklistedToken)
+                .where(BlacklistedToken.blacklistedid.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            batches += 1
+            if result.rowcount < batch_size or time.monotonic() >= deadline:
+                break
     except Exception as e:
         print(f"Error occurred while deleting blacklisted tokens: {e}")
         db.session.rollback()
         raise
+    report = {
+        "deleted": deleted,
+        "batches": batches,
+        "finished": result.rowcount < batch_size,
+    }
+    print(f"Deleted {deleted} blacklisted tokens in {batches} batches.")
+    return report
+
+
+@shared_task(ignore_result=True)
+def refresh_user_recommendations(user_ids):
+    from sevaksha_app.recommendations import refresh_users
+
+    rows = refresh_users(user_ids)
+    print(f"Refreshed recommendations of {len(user_ids)} users ({rows} rows).")
+
+
+@shared_task
+def refresh_recommendations():
+    from sevaksha_app.recommendations import refresh_stale
+
+    report = refresh_stale()
+    print(f"Refreshed recommendations: {report}")
+    return report
+
+
+@shared_task(bind=True)
+def screen_profiles(self, userid, batch_id, total):
+    """Screens a batch stored with BatchStore; the results go back to the store, not the backend."""
+    from sevaksha_app.eligibility import EligibilityEngine, get_batch_store, screen_rows
+
+    engine = EligibilityEngine.from_catalog()
+    store = get_batch_store()
+    chunk_size = current_app.config["ELIGIBILITY_BATCH_CHUNK_SIZE"]
+    done = 0
+    for rows in store.row_chunks(batch_id, chunk_size):
+        store.add_results(batch_id, list(screen_rows(engine, rows, chunk_size, done)))
+        done += len(rows)
+        self.update_state(
+            state="PROGRESS", meta={"userid": userid, "done": done, "total": total}
+        )
+    store.drop_rows(batch_id)
+    print(f"Screened {done} profiles for user {userid}.")
+    return {"userid": userid, "done": done, "total": total}
@@ -1,8 +1,15 @@
 from sevaksha_app.utils import DecoratedBlueprint
 from sevaksha_app.utils import handle_exceptions, login_required
+from sevaksha_app.rate_limit import rate_limit
 
 user = DecoratedBlueprint(
-    "user", __name__, decorators=[login_required(), handle_exceptions]
+    "user",
+    __name__,
+    decorators=[
+        login_required(),
+        rate_limit({"chat": "RATE_LIMIT_CHAT", "chat_stream": "RATE_LIMIT_CHAT"}),
+        handle_exceptions,
+    ],
 )
 
 from .routes import *
@@ -1,6 +1,8 @@
 import os
 import jwt
-from flask import jsonify, request
+import json
+import time
+from flask import jsonify, request, Response, stream_with_context
 from sevaksha_app.models import User, BlacklistedToken, WelfareScheme
 from sevaksha_app import db, ist
 from sevaksha_app.user.forms import (
@@ -13,62 +15,74 @@ from sevaksha_app.user.forms import (
 
 from flask import current_app
 from datetime import datetime
-from sevaksha_app import bcrypt
+from sevaksha_app.passwords import get_password_hasher
 from sevaksha_app.utils import (
     delete_file,
     save_file,
     form_errors,
+    get_current_user,
+    get_principal,
+    invalidate_principal,
+    rag_required,
     send_reset_email,
     validate_file,
 )
 from . import user
-from sevaksha_app.rag.qa_chain import create_qa_chain
-from .user_rag.user_qa_chain import create_user_qa_chain
+from sevaksha_app.rag import get_engine, is_ready, reset_chat
+from sevaksha_app.eligibility import (
+    get_batch_store,
+    get_eligibility_engine,
+    parse_profiles_csv,
+    profile_from_user,
+    screen_rows,
+)
+from sevaksha_app.recommendations import (
+    profile_hash,
+    queue_refresh,
+    recommendations_for,
+    refresh_users,
+)
+from sevaksha_app.revocation import get_revocation_list
+from sevaksha_app.tasks import screen_profiles
 import jwt
 import threading
 
 
-qa_chain = create_qa_chain()
-
-user_qa_chain = create_user_qa_chain()
-
 
 @user.route("/recommendation", methods=["POST"])
 def recommendation(userid):
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
 
-    current_user = User.query.get(userid)
-
-    response_text = qa_chain.run(
-        " ".join(
-            [
-                str(current_user.age),
-                str(current_user.income),
-                current_user.occupation,
-                current_user.gender,
-                current_user.martial_status,
-            ]
-        )
-    )
-
-    if "couldn't find any scheme" in response_text.lower():
-        return jsonify({"results": None}), 200
-
-    scheme_names = [
-        line.lstrip("- ").strip()
-        for line in response_text.splitlines()
-        if line.startswith("- ")
-    ]
-
-    schemes = WelfareScheme.query.filter(
-        WelfareScheme.scheme_name.in_(scheme_names)
-    ).all()
+    current_user = get_principal()
+    profile = profile_from_user(current_user)
+    engine = get_eligibility_engine()
+    rows, state, staleness = recommendations_for(current_user, engine.version)
+    if staleness == "profile":
+        refresh_users([userid], engine)
+        rows, state, staleness = recommendations_for(current_user, engine.version)
+    elif staleness == "catalog":
+        queue_refresh([userid])
+    ranked = [row.to_dict() for row in rows if row.eligible]
+
+    if not ranked:
+        return jsonify({"results": None, "stale": staleness is not None}), 200
+
+    schemes = {
+        scheme.scheme_id: scheme
+        for scheme in WelfareScheme.query.filter(
+            WelfareScheme.scheme_id.in_([match["scheme_id"] for match in ranked])
+        ).all()
+    }
 
     result = []
-    for scheme in schemes:
+    for match in ranked:
+        scheme = schemes.get(match["scheme_id"])
+        if scheme is None:
+            continue
         result.append(
             {
+                "scheme_id": scheme.scheme_id,
                 "scheme_name": scheme.scheme_name,
                 "min_age": scheme.min_age,
                 "max_age": scheme.max_age,
@@ -82,45 +96,177 @@ def recommendation(userid):
                 "application_link": scheme.application_link,
                 "language_support": scheme.language_support,
                 "is_active": scheme.is_active,
+                "matched_criteria": match["matched"],
+                "unmatched_criteria": match["unmatched"],
+                "unknown_criteria": match["unknown"],
             }
         )
 
-    return jsonify({"results": result}), 200
+    response = {
+        "results": result,
+        "stale": staleness is not None,
+        "refreshed_at": state.refreshed_at.isoformat() if state else None,
+    }
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and data.get("explain") and is_ready():
+        response["explanation"] = get_engine().answer(
+            "Briefly explain why these schemes suit a person with "
+            + ", ".join(f"{key}: {value}" for key, value in profile.items() if value)
+            + ":\n"
+            + "\n".join(f"- {item['scheme_name']}" for item in result[:5]),
+            "chat",
+        )
+
+    return jsonify(response), 200
+
+
+def batch_rows():
+    """Profiles from a JSON body, a CSV upload or a raw text/csv body."""
+    upload = request.files.get("file")
+    if upload is not None:
+        return parse_profiles_csv(upload.read().decode("utf-8-sig"))
+    if request.mimetype == "text/csv":
+        return parse_profiles_csv(request.get_data(as_text=True))
+    if request.is_json:
+        data = request.get_json()
+        rows = data.get("profiles") if isinstance(data, dict) else data
+        if isinstance(rows, list) and all(isinstance(row, dict) for row in rows):
+            return rows
+    return None
+
+
+@user.route("/eligibility/batch", methods=["POST"])
+def eligibility_batch(userid):
+    rows = batch_rows()
+    if rows is None:
+        return (
+            jsonify({"error": "Send a JSON list of profiles or a CSV file with a header row."}),
+            400,
+        )
+    if len(rows) > current_app.config["ELIGIBILITY_BATCH_MAX"]:
+        return (
+            jsonify(
+                {"error": f"At most {current_app.config['ELIGIBILITY_BATCH_MAX']} profiles per batch."}
+            ),
+            413,
+        )
+
+    chunk_size = current_app.config["ELIGIBILITY_BATCH_CHUNK_SIZE"]
+    if len(rows) > current_app.config["ELIGIBILITY_BATCH_SYNC_LIMIT"]:
+        # The rows go to Redis; the Celery message only carries the batch id.
+        batch_id = get_batch_store().create(userid, rows, chunk_size)
+        screen_profiles.apply_async(args=(userid, batch_id, len(rows)), task_id=batch_id)
+        return jsonify({"job_id": batch_id, "total": len(rows)}), 202
+
+    engine = get_eligibility_engine()
+
+    def generate():
+        for result in screen_rows(engine, rows, chunk_size):
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@user.route("/eligibility/batch/<job_id>", methods=["GET"])
+def eligibility_batch_status(userid, job_id):
+    """A batch's progress; once done, ``limit`` results from ``offset`` at a time."""
+    store = get_batch_store()
+    if store.owner(job_id) != userid:
+        # Unknown ids and other users' jobs look the same as jobs not started yet.
+        return jsonify({"job_id": job_id, "state": "PENDING"}), 200
+    job = current_app.extensions["celery"].AsyncResult(job_id)
+    if job.state in ("PENDING", "FAILURE"):
+        return jsonify({"job_id": job_id, "state": job.state}), 200
+
+    info = job.info if isinstance(job.info, dict) else {}
+    response = {
+        "job_id": job_id,
+        "state": job.state,
+        "done": info.get("done"),
+        "total": info.get("total"),
+    }
+    if job.state == "SUCCESS":
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        limit = request.args.get("limit", current_app.config["ELIGIBILITY_BATCH_CHUNK_SIZE"], type=int)
+        limit = min(max(limit, 1), current_app.config["ELIGIBILITY_BATCH_CHUNK_SIZE"])
+        response["offset"] = offset
+        response["results"] = store.results(job_id, offset, limit)
+        if offset + len(response["results"]) < (info.get("total") or 0):
+            response["next_offset"] = offset + len(response["results"])
+    return jsonify(response), 200
 
 
 @user.route("/chat", methods=["POST"])
+@rag_required
 def chat(userid):
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
 
-    current_user = User.query.get(userid)
-
     form = ChatForm(data=request.get_json())
     if not form.validate():
         return jsonify({"error": form_errors(form.errors)}), 400
 
     try:
-        response = qa_chain.run(
-            " ".join(
-                [
-                    str(current_user.age),
-                    str(current_user.income),
-                    current_user.occupation,
-                    current_user.gender,
-                    current_user.martial_status,
-                ]
-            )
-        )
+        response = get_engine().answer(form.query.data, "chat", user_id=userid)
         return jsonify({"response": response}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@user.route("/chat", methods=["DELETE"])
+def clear_chat(userid):
+    return jsonify(reset_chat("chat", user_id=userid)), 200
+
+
+def sse(data, event=None):
+    message = f"data: {json.dumps(data)}\n\n"
+    return f"event: {event}\n{message}" if event else message
+
+
+@user.route("/chat/stream", methods=["POST"])
+@rag_required
+def chat_stream(userid):
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    form = ChatForm(data=request.get_json())
+    if not form.validate():
+        return jsonify({"error": form_errors(form.errors)}), 400
+
+    query = form.query.data
+
+    def generate():
+        started = time.perf_counter()
+        first_token = None
+        try:
+            for token in get_engine().stream(query, "chat", user_id=userid):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                yield sse({"token": token})
+        except Exception as e:
+            yield sse({"error": str(e)}, "error")
+            return
+        finished = time.perf_counter()
+        timings = {
+            "ttft_ms": round(((first_token or finished) - started) * 1000, 1),
+            "total_ms": round((finished - started) * 1000, 1),
+        }
+        print(f"chat stream for user {userid}: {timings}")
+        yield sse(timings, "done")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @user.route("/account", methods=["POST"])
 def update_profile(userid):
-    current_user = User.query.get(userid)
+    current_user = get_current_user()
     data = request.form.to_dict()
     form = UpdateProfileForm(data=data, current_user=current_user)
+    previous_profile = profile_hash(profile_from_user(current_user))
     if current_user.urole == "librarian" and (
         form.name.data != current_user.name
         or form.username.data != current_user.username
@@ -132,7 +278,7 @@ def update_profile(userid):
             403,
         )
     if form.validate():
-        if bcrypt.check_password_hash(current_user.password, form.password.data):
+        if get_password_hasher().check(current_user.password, form.password.data):
             profile_picture_data = request.files.get("profile_picture")
             if profile_picture_data:
                 return_val = validate_file(profile_picture_data, "image")
@@ -158,6 +304,9 @@ def update_profile(userid):
                 current_user.username = form.username.data
             current_user.email = form.email.data
             db.session.commit()
+            invalidate_principal(userid)
+            if profile_hash(profile_from_user(current_user)) != previous_profile:
+                queue_refresh([userid])
             return jsonify({"message": "Account has been updated successfully."}), 200
         else:
             return jsonify({"error": "The password is incorrect."}), 400
@@ -170,18 +319,15 @@ def update_profile(userid):
 
 @user.route("/account", methods=["PUT"])
 def change_password(userid):
-    current_user = User.query.get(userid)
+    current_user = get_current_user()
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
     data = request.get_json()
     form = ChangePasswordForm(data=data)
     if form.validate():
-        if bcrypt.check_password_hash(
-            current_user.password, form.current_password.data
-        ):
-            current_user.password = bcrypt.generate_password_hash(
-                form.new_password.data
-            ).decode("utf-8")
+        hasher = get_password_hasher()
+        if hasher.check(current_user.password, form.current_password.data):
+            current_user.password = hasher.hash(form.new_password.data)
             db.session.commit()
             return jsonify({"message": "Your password has been updated!"}), 200
         else:
@@ -195,7 +341,7 @@ def change_password(userid):
 
 @user.route("/reset", methods=["GET"])
 def reset_request(userid):
-    user = User.query.get(userid)
+    user = get_current_user()
     send_reset_email(user, "user")
     return (
         jsonify(
@@ -219,9 +365,7 @@ def reset_password(userid, token):
         return jsonify({"error": "Token does not match the user."}), 400
     form = ResetPasswordForm(data=data)
     if form.validate():
-        user.password = bcrypt.generate_password_hash(form.password.data).decode(
-            "utf-8"
-        )
+        user.password = get_password_hasher().hash(form.password.data)
         db.session.commit()
 
         return jsonify({"message": "Your password has been updated!"}), 201
@@ -234,6 +378,7 @@ def reset_password(userid, token):
 
 @user.route("/logout", methods=["GET"])
 def logout(userid):
+    user = get_current_user()
     token = request.headers.get("Authorization")
     try:
         if token.startswith("Bearer "):
@@ -243,10 +388,10 @@ def logout(userid):
         )
         expiry = datetime.fromtimestamp(decoded["exp"], ist)
         blacklisted_token = BlacklistedToken(token=token, expiry=expiry)
-        user = User.query.get(userid)
         user.authenticated = False
         db.session.add(blacklisted_token)
         db.session.commit()
+        get_revocation_list().revoke(token, decoded["exp"])
         return jsonify({"message": "Logged out successfully."}), 200
     except jwt.ExpiredSignatureError:
         return jsonify({"error": "Token already expired."}), 400
@@ -258,13 +403,13 @@ def logout(userid):
 
 @user.route("/account", methods=["POST"])
 def delete_account(userid):
-    current_user = User.query.get(userid)
+    current_user = get_current_user()
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
     data = request.get_json()
     form = DeleteAccountForm(data=data)
     if form.validate():
-        if bcrypt.check_password_hash(current_user.password, form.password.data):
+        if get_password_hasher().check(current_user.password, form.password.data):
             if current_user.profile_picture != "default_profile_picture.png":
                 delete_file(
                     os.path.join("user", "profile_pictures"),
@@ -272,6 +417,7 @@ def delete_account(userid):
                 )
             db.session.delete(current_user)
             db.session.commit()
+            invalidate_principal(userid)
 
             return jsonify({"message": "Account deleted successfully."}), 200
         else:
@@ -1,11 +0,0 @@
-from .user_qa_chain import create_user_qa_chain
-from .gemini_api import query_gemini, reset_chat, get_chat_history
-from .gemini_llm import GeminiLLM
-
-__all__ = [
-    "create_user_qa_chain",
-    "query_gemini",
-    "reset_chat",
-    "get_chat_history",
-    "GeminiLLM",
-]
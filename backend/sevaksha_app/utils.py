@@ -1,10 +1,12 @@
+import hmac
 import secrets
 import os
 from functools import wraps
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.utils import secure_filename
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, current_app, g, jsonify, request
 from sevaksha_app import db
+from sevaksha_app.passwords import PasswordHasherBusy
 from flask_mail import Message
 from sevaksha_app import mail
 from datetime import datetime
@@ -25,43 +27,122 @@ class DecoratedBlueprint(Blueprint):
         super().add_url_rule(rule, endpoint, view_func, **options)
 
 
+PRINCIPAL_FIELDS = (
+    "userid",
+    "name",
+    "email",
+    "mobile",
+    "age",
+    "income",
+    "occupation",
+    "gender",
+    "marital_status",
+)
+
+
+class AccountNotFound(LookupError):
+    """The authenticated user's row is gone, e.g. deleted while its principal was cached."""
+
+
+class Principal:
+    """Read-only snapshot of the authenticated user, as cached between requests."""
+
+    def __init__(self, data):
+        self.__dict__.update(data)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def _principal_key(userid):
+    return f"principal:{userid}"
+
+
+def _load_principal(userid):
+    """The cached snapshot of ``userid``; on a miss the user row is loaded once and kept on ``g``."""
+    from sevaksha_app import cache
+    from sevaksha_app.models import User
+
+    try:
+        snapshot = cache.get(_principal_key(userid))
+    except Exception:
+        snapshot = None
+    if snapshot is not None:
+        return Principal(snapshot)
+
+    user = db.session.get(User, userid)
+    if user is None:
+        return None
+    g.current_user = user
+    snapshot = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+    snapshot["income"] = float(user.income) if user.income is not None else None
+    try:
+        cache.set(
+            _principal_key(userid),
+            snapshot,
+            timeout=current_app.config["PRINCIPAL_CACHE_TTL"],
+        )
+    except Exception as e:
+        print(f"Couldn't cache principal {userid}: {e}")
+    return Principal(snapshot)
+
+
+def get_principal():
+    """The authenticated user's snapshot; enough for read-only endpoints."""
+    return g.principal
+
+
+def get_current_user():
+    """The authenticated user's row, loaded at most once per request.
+
+    Raises AccountNotFound (answered 404 by handle_exceptions) when the
+    row has been deleted since the principal was cached.
+    """
+    if g.get("current_user") is None:
+        from sevaksha_app.models import User
+
+        user = db.session.get(User, g.principal.userid)
+        if user is None:
+            invalidate_principal(g.principal.userid)
+            raise AccountNotFound(g.principal.userid)
+        g.current_user = user
+    return g.current_user
+
+
+def invalidate_principal(userid):
+    from sevaksha_app import cache
+
+    try:
+        cache.delete(_principal_key(userid))
+    except Exception as e:
+        print(f"Couldn't invalidate principal {userid}: {e}")
+
+
 def login_required():
     def wrapper(fn):
+        pass_userid = "userid" in inspect.signature(fn).parameters
+
         @wraps(fn)
         def func(*args, **kwargs):
             token = request.headers.get("Authorization")
             if not token:
                 return "Token is missing", 403
-            from sevaksha_app.models import User, BlacklistedToken
+            from sevaksha_app.revocation import get_revocation_list
 
             try:
                 if token.startswith("Bearer "):
                     token = token[len("Bearer ") :]
-                blacklisted_token = BlacklistedToken.query.filter_by(
-                    token=token
-                ).first()
-                if blacklisted_token:
-                    if blacklisted_token.is_expired():
-                        db.session.delete(blacklisted_token)
-                        db.session.commit()
-                        return (
-                            jsonify(
-                                {"error": "Token has expired. Please login again."}
-                            ),
-                            403,
-                        )
-                    else:
-                        return jsonify({"message": "Token is blacklisted"}), 401
+                if get_revocation_list().is_revoked(token):
+                    return jsonify({"message": "Token is blacklisted"}), 401
                 decoded_token = jwt.decode(
                     token, current_app.config["SECRET_KEY"], algorithms=["HS256"]
                 )
                 userid = decoded_token.get("userid")
-                user = User.query.get(userid)
-                print(user)
-                if not user:
+                principal = _load_principal(userid)
+                if not principal:
                     return jsonify({"error": "Please login again."}), 404
-                sig = inspect.signature(fn)
-                if "userid" in sig.parameters:
+                g.principal = principal
+                if pass_userid:
                     return fn(userid=userid, *args, **kwargs)
                 else:
                     return fn(*args, **kwargs)
@@ -88,12 +169,49 @@ def handle_exceptions(func):
         except SQLAlchemyError:
             db.session.rollback()
             return jsonify({"error": "A database error occurred."}), 500
+        except AccountNotFound:
+            db.session.rollback()
+            return jsonify({"error": "Please login again."}), 404
+        except PasswordHasherBusy:
+            db.session.rollback()
+            response = jsonify({"error": "The server is busy. Please try again shortly."})
+            return response, 503, {"Retry-After": "2"}
         except Exception:
             db.session.rollback()
             return jsonify({"error": "An unexpected error occurred."}), 500
 
     return wrapper
 
+def rag_required(fn):
+    """Answers 503 with Retry-After while the RAG engine is still warming up."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from sevaksha_app.rag import is_ready, start_warm_up
+
+        if not is_ready():
+            start_warm_up(current_app._get_current_object())
+            response = jsonify(
+                {"error": "The assistant is starting up. Please try again shortly."}
+            )
+            return response, 503, {"Retry-After": "5"}
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+def metrics_token_required(fn):
+    """Admits only requests bearing METRICS_TOKEN; the internal blueprint is off without one."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config["METRICS_TOKEN"]
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not expected or not hmac.compare_digest(token, expected):
+            return jsonify({"error": "Not found"}), 404
+        return fn(*args, **kwargs)
+
+    return wrapper
+
 def form_errors(errors):
     return next(iter(errors)) + " : " + errors[next(iter(errors))][0]
 
@@ -0,0 +1,184 @@
+"""EXPLAINs the hot queries against large seeded tables and fails on sequential scans.
+
+    TEST_DATABASE_URL=postgresql://.../sevaksha_test pytest
+
+Runs only against the dedicated database in TEST_DATABASE_URL, which is
+migrated like any other; without it the tests are skipped. Synthetic
+users, schemes, applications, recommendations and revoked tokens are
+seeded inside a transaction, ANALYZEd, every query plan is checked and
+everything is rolled back.
+"""
+import json
+import os
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set.", allow_module_level=True)
+
+from sqlalchemy import text
+from sevaksha_app import create_app, db
+from sevaksha_app.config import Config
+from sevaksha_app.models import SCHEME_KEY_SQL
+
+USERS = int(os.environ.get("TEST_EXPLAIN_USERS", 50000))
+SCHEMES = int(os.environ.get("TEST_EXPLAIN_SCHEMES", 2000))
+
+SEEDED_TABLES = (
+    "user",
+    "welfare_schemes",
+    "applications",
+    "user_recommendations",
+    "blacklistedtoken",
+)
+
+SEED_SQL = [
+    """
+    INSERT INTO "user" (name, email, password, authenticated, mobile)
+    SELECT 'Explain ' || i, 'explain-' || i || '@example.invalid', 'x', false,
+           (8000000000 + i)::text
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO welfare_schemes (scheme_name, is_active, created_at, updated_at)
+    SELECT 'Explain scheme ' || i, i % 10 <> 0, now(),
+           now() - make_interval(mins => i)
+    FROM generate_series(1, :schemes) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    # Most applications have been decided; only a few are still pending.
+    """
+    WITH u AS (
+        SELECT userid, row_number() OVER (ORDER BY userid) AS n
+        FROM "user" WHERE email LIKE 'explain-%@example.invalid'
+    ), s AS (
+        SELECT scheme_id, row_number() OVER (ORDER BY scheme_id) - 1 AS n
+        FROM welfare_schemes WHERE scheme_name LIKE 'Explain scheme %'
+    )
+    INSERT INTO applications (user_id, scheme_id, status, created_at, updated_at)
+    SELECT u.userid, s.scheme_id,
+           CASE WHEN (u.n + k) % 20 = 0 THEN 'Pending'
+                WHEN (u.n + k) % 2 = 0 THEN 'Approved'
+                ELSE 'Rejected' END,
+           now(), now()
+    FROM u CROSS JOIN generate_series(1, 3) AS k
+    JOIN s ON s.n = (u.n * 7 + k) % :schemes
+    """,
+    """
+    WITH u AS (
+        SELECT userid, row_number() OVER (ORDER BY userid) AS n
+        FROM "user" WHERE email LIKE 'explain-%@example.invalid'
+    ), s AS (
+        SELECT scheme_id, row_number() OVER (ORDER BY scheme_id) - 1 AS n
+        FROM welfare_schemes WHERE scheme_name LIKE 'Explain scheme %'
+    )
+    INSERT INTO user_recommendations
+        (user_id, scheme_id, rank, eligible, score, matched, unmatched, unknown)
+    SELECT u.userid, s.scheme_id, k, true, 1.0 / (k + 1), '', '', ''
+    FROM u CROSS JOIN generate_series(0, 4) AS k
+    JOIN s ON s.n = (u.n * 11 + k) % :schemes
+    """,
+    """
+    INSERT INTO blacklistedtoken (token, expiry)
+    SELECT 'explain-' || md5(i::text), now() + make_interval(hours => i % 48 - 24)
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+HOT_QUERIES = {
+    "login by email or mobile": """
+        SELECT * FROM "user"
+        WHERE email = 'explain-42@example.invalid' OR mobile = '8000000042'
+    """,
+    "user's applications": """
+        SELECT * FROM applications WHERE user_id = :userid
+    """,
+    "user's applications by status": """
+        SELECT * FROM applications WHERE user_id = :userid AND status = 'Pending'
+    """,
+    "scheme's applications": """
+        SELECT * FROM applications WHERE scheme_id = :scheme_id
+    """,
+    "pending applications queue": """
+        SELECT * FROM applications WHERE status = 'Pending'
+        ORDER BY created_at LIMIT 50
+    """,
+    "scheme by normalized name": f"""
+        SELECT * FROM welfare_schemes
+        WHERE {SCHEME_KEY_SQL} = 'explain scheme 42'
+    """,
+    "schemes by id": """
+        SELECT * FROM welfare_schemes WHERE scheme_id IN (:scheme_id, :scheme_id + 1)
+    """,
+    "schemes changed since": """
+        SELECT * FROM welfare_schemes WHERE updated_at > now() - interval '5 minutes'
+    """,
+    "user's recommendations": """
+        SELECT * FROM user_recommendations WHERE user_id = :userid ORDER BY rank
+    """,
+    "revoked token": """
+        SELECT * FROM blacklistedtoken WHERE token = 'explain-' || md5('42')
+    """,
+    "expired tokens batch": """
+        SELECT blacklistedid FROM blacklistedtoken WHERE expiry <= now()
+        ORDER BY expiry LIMIT 1000
+    """,
+}
+
+
+def _sequential_scans(plan):
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in SEEDED_TABLES:
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans += _sequential_scans(child)
+    return scans
+
+
+@pytest.fixture(scope="module")
+def app():
+    if TEST_DATABASE_URL == Config.SQLALCHEMY_DATABASE_URI:
+        pytest.skip("TEST_DATABASE_URL must not be the application database.")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Config, "SQLALCHEMY_DATABASE_URI", TEST_DATABASE_URL)
+        patch.setattr(Config, "SCHEMA_AUTO_UPGRADE", True)
+        app, _ = create_app()
+    return app
+
+
+@pytest.fixture(scope="module")
+def plans(app):
+    """Plans of HOT_QUERIES over seeded tables, as {name: (plan text, sequentially scanned tables)}."""
+    params = {"users": USERS, "schemes": SCHEMES}
+    with app.app_context():
+        try:
+            for statement in SEED_SQL:
+                db.session.execute(text(statement), params)
+            for table in SEEDED_TABLES:
+                db.session.execute(text(f'ANALYZE "{table}"'))
+            params["userid"] = db.session.execute(
+                text("""SELECT userid FROM "user" WHERE email = 'explain-42@example.invalid'""")
+            ).scalar()
+            params["scheme_id"] = db.session.execute(
+                text("SELECT scheme_id FROM welfare_schemes WHERE scheme_name = 'Explain scheme 42'")
+            ).scalar()
+
+            results = {}
+            for name, query in HOT_QUERIES.items():
+                plan = db.session.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {query}"), params
+                ).scalar()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                lines = db.session.execute(text(f"EXPLAIN {query}"), params).scalars()
+                results[name] = ("\n".join(lines), _sequential_scans(plan))
+            return results
+        finally:
+            db.session.rollback()
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_indexes(plans, name):
+    plan, scans = plans[name]
+    assert not scans, f"sequential scan on {', '.join(scans)}:\n{plan}"
@@ -0,0 +1,19 @@
+import os
+
+# Set before torch, faiss and tokenizers load: their thread pools must not be
+# started in the master, and every worker gets its own core.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+from dotenv import load_dotenv
+from sevaksha_app import create_app
+from sevaksha_app.rag import warm_up
+
+load_dotenv()
+
+app, celery_app = create_app()
+
+# With preload_app the embedding model, index and caches are loaded once here
+# and shared copy-on-write by every forked worker.
+warm_up(app)